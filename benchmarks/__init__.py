@@ -0,0 +1,10 @@
+"""Benchmarks of the PowerSeries operators and symbolic simplification.
+
+Run them with
+
+    python -m benchmarks [--quick] [--json results.json] [name ...]
+
+Each benchmark times a workload at a range of sizes, fits the exponent k in
+time ~ n^k, and fails if k exceeds the exponent it is expected to stay under.
+The exit status is non-zero if any benchmark fails.
+"""
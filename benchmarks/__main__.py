@@ -0,0 +1,50 @@
+import argparse
+import json
+import platform
+import sys
+
+from benchmarks.suite import BENCHMARKS, run
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__package__ and sys.modules[__package__].__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('names', nargs='*', help='Benchmarks to run (default: all)')
+    parser.add_argument('--quick', action='store_true', help='Only time the three smallest sizes, once each')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per size; the best is kept')
+    parser.add_argument('--json', metavar='PATH', help='Write the results to PATH as JSON')
+    parser.add_argument('--list', action='store_true', help='List the benchmarks and exit')
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for b in BENCHMARKS:
+            print(f'{b.name:24} {b.setup.__doc__}')
+        return 0
+
+    unknown = set(args.names) - {b.name for b in BENCHMARKS}
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+    selected = [b for b in BENCHMARKS if not args.names or b.name in args.names]
+
+    results = []
+    for b in selected:
+        result = run(b, quick=args.quick, repeat=args.repeat)
+        results.append(result)
+        timings = '  '.join(f'{n}: {t:.4f}s' for n, t in zip(result.sizes, result.seconds))
+        status = 'ok' if result.passed else ('WRONG' if not result.correct else 'SLOW')
+        print(f'{b.name:24} n^{result.exponent:.2f} (max {result.max_exponent})  {status:5}  {timings}')
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'quick': args.quick,
+                'results': [r.to_dict() for r in results],
+            }, f, indent=2)
+
+    return 0 if all(r.passed for r in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
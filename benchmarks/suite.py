@@ -0,0 +1,253 @@
+"""Workload definitions and the timing harness"""
+from dataclasses import dataclass, field, asdict
+from fractions import Fraction
+from typing import Callable
+import gc
+import math
+import time
+
+from wilf.powerseries import PowerSeries, Polynomial, exp, derivative, integral
+from wilf.multivariate import MultivariatePolynomial
+from wilf.rings import GF, QQ, ZZ
+from wilf.symbolics import Symbol
+
+
+@dataclass
+class Benchmark:
+    """A workload timed at several sizes.
+
+    Attributes:
+        name: Identifies the benchmark on the command line and in results.
+        setup: Takes a size n and returns a function to time. Everything it
+            builds must be new, so no work is cached between runs; runs
+            only share series if they are held on to elsewhere.
+        sizes: The sizes to time, increasing.
+        max_exponent: The fitted k in time ~ n^k must not exceed this.
+        check: Optionally takes the result of the timed function at the
+            smallest size, and returns whether it is correct.
+    """
+    name : str
+    setup : Callable[[int], Callable]
+    sizes : tuple
+    max_exponent : float
+    check : Callable = None
+
+
+@dataclass
+class Result:
+    name : str
+    sizes : list
+    seconds : list
+    exponent : float
+    max_exponent : float
+    passed : bool
+    correct : bool = True
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+BENCHMARKS = []
+
+def benchmark(sizes : tuple, max_exponent : float, check : Callable = None):
+    """Register a setup function as a benchmark"""
+    def register(setup):
+        BENCHMARKS.append(Benchmark(setup.__name__, setup, sizes, max_exponent, check))
+        return setup
+    return register
+
+
+def _x(ring=None):
+    x = PowerSeries.x
+    return x if ring is None else x.over(ring)
+
+
+def _leaf(coeffs):
+    """A dense leaf with the given float coefficients, followed by zeros.
+
+    Small sparse series such as 1 - 0.5x take recurrences over their terms,
+    so the dense kernels are timed on leaves instead.
+    """
+    return PowerSeries(lambda i: coeffs[i] if i < len(coeffs) else 0.0)
+
+
+def _geometric_product():
+    """1/(1-x) * 1/(1-2x) over a prime field, as a product of two dense leaves.
+
+    Built from (1 - x).inverse() instead, the product would be a sparse
+    recurrence rather than a Cauchy product.
+    """
+    ring = GF(998244353)
+    return PowerSeries(lambda i: 1, ring=ring) * PowerSeries(lambda i: pow(2, i, ring.p), ring=ring)
+
+
+@benchmark(sizes=(4000, 8000, 16000, 32000), max_exponent=1.5,
+           check=lambda c: c[10] == 2 ** 11 - 1)
+def mul_block(n):
+    """A product of series over a prime field, taken as one block (NTT)"""
+    a = _geometric_product()
+    return lambda: a.coefficients(n)
+
+
+@benchmark(sizes=(250, 500, 1000, 2000), max_exponent=2.3,
+           check=lambda c: c[10] == 2 ** 11 - 1)
+def mul_online(n):
+    """The same product, one coefficient at a time"""
+    a = _geometric_product()
+    return lambda: [a.f(i) for i in range(n)]
+
+
+@benchmark(sizes=(2000, 4000, 8000, 16000), max_exponent=1.6,
+           check=lambda c: math.isclose(c[3], 0.375))
+def inverse(n):
+    """The reciprocal of a float series (Newton iteration)"""
+    a = 1 / _leaf([1.0, -0.5, -0.25])
+    return lambda: a.coefficients(n)
+
+
+@benchmark(sizes=(1000, 2000, 4000, 8000), max_exponent=2.3,
+           check=lambda c: math.isclose(c[3], 1 / 6))
+def exponential(n):
+    """exp of a float series"""
+    a = exp(_leaf([0.0, 1.0]))
+    return lambda: a.coefficients(n)
+
+
+@benchmark(sizes=(1000, 2000, 4000, 8000), max_exponent=2.3,
+           check=lambda c: math.isclose(c[2], 0.09375))
+def real_power(n):
+    """A float series to the power -1/2"""
+    a = _leaf([1.0, -0.5]) ** -0.5
+    return lambda: a.coefficients(n)
+
+
+@benchmark(sizes=(25000, 50000, 100000, 200000), max_exponent=1.3,
+           check=lambda c: c[5] == 5)
+def derivative_integral(n):
+    """Termwise operations on a leaf series"""
+    a = PowerSeries(lambda i: i)
+    b = integral(derivative(3 * a - a + 1)) / 2
+    return lambda: b.coefficients(n)
+
+
+@benchmark(sizes=(2000, 4000, 8000, 16000), max_exponent=1.6,
+           check=lambda qr: (qr[0] * qr[2] + qr[1]).coeffs == qr[3].coeffs)
+def polynomial_divmod(n):
+    """Division with remainder of a degree 2n polynomial by a degree n one, mod a prime"""
+    ring = GF(998244353)
+    f = Polynomial([i * i + 1 for i in range(2 * n)], ring)
+    g = Polynomial([3 * i + 1 for i in range(n)], ring)
+    return lambda: divmod(f, g) + (g, f)
+
+
+@benchmark(sizes=(250, 500, 1000, 2000), max_exponent=3.0,
+           check=lambda c: c[10] == 16796)
+def catalan(n):
+    """Catalan numbers as (1 - sqrt(1 - 4x)) / 2x, exactly over QQ"""
+    x = _x(QQ)
+    a = (1 - (1 - 4 * x) ** Fraction(1, 2)).shift(-1) / 2
+    return lambda: a.coefficients(n)
+
+
+@benchmark(sizes=(100, 150, 200, 300), max_exponent=2.5,
+           check=lambda c: c[50] == 204226)
+def partitions(n):
+    """Partition numbers as the product of 1 / (1 - x^k) for k = 1..n"""
+    def run():
+        x = _x(ZZ)
+        p = PowerSeries.one.over(ZZ)
+        for k in range(1, n + 1):
+            p = p * (1 - x.shift(k - 1)).inverse()
+        return p.coefficients(n + 1)
+    return run
+
+
+@benchmark(sizes=(8, 12, 16, 24), max_exponent=3.0,
+           check=lambda c: c.subs({Symbol('t'): 1}) == 1)
+def legendre_symbolic(n):
+    """The n-th Legendre polynomial with symbolic coefficients"""
+    t = Symbol('t')
+    x = _x()
+    legendre = 1 / ((1 - 2 * x * t + x**2)**0.5)
+    return lambda: legendre.f(n)
+
+
+@benchmark(sizes=(12, 25, 50, 100), max_exponent=4.0,
+           check=lambda c: c.subs({Symbol('t'): 1}) == 1)
+def legendre_polynomial(n):
+    """The n-th Legendre polynomial with MultivariatePolynomial coefficients"""
+    t = MultivariatePolynomial.symbol('t')
+    x = _x()
+    legendre = 1 / ((1 - 2 * x * t + x**2)**0.5)
+    return lambda: legendre.f(n)
+
+
+@benchmark(sizes=(50, 100, 200, 400), max_exponent=2.5)
+def symbolic_sum(n):
+    """Building an n term symbolic sum with + (simplifying as it goes)"""
+    symbols = [Symbol(f's{i}') for i in range(n)]
+    def run():
+        e = 0
+        for i, s in enumerate(symbols):
+            e = e + (i + 1) * s
+        return e
+    return run
+
+
+@benchmark(sizes=(50, 100, 200, 400), max_exponent=2.5)
+def symbolic_product(n):
+    """Building an n factor symbolic product with *"""
+    symbols = [Symbol(f'p{i}') for i in range(n)]
+    def run():
+        e = 1
+        for s in symbols:
+            e = e * (s + 1)
+        return e
+    return run
+
+
+def run(benchmark : Benchmark, quick : bool = False, repeat : int = 3) -> Result:
+    """Time a benchmark at each of its sizes, taking the best of repeat runs.
+
+    quick only uses the three smallest sizes, and a single run of each. The
+    smallest size is run once beforehand, untimed, to warm up imports and
+    module level caches.
+    """
+    sizes = benchmark.sizes[:3] if quick else benchmark.sizes
+    benchmark.setup(sizes[0])()
+    repeat = 1 if quick else repeat
+    seconds = []
+    correct = True
+    for i, n in enumerate(sizes):
+        best = math.inf
+        for _ in range(repeat):
+            # Equal series are shared while they're alive (see _node), so the
+            # previous run has to be gone for this one to start from scratch
+            f = out = None
+            gc.collect()
+            f = benchmark.setup(n)
+            start = time.perf_counter()
+            out = f()
+            best = min(best, time.perf_counter() - start)
+        if i == 0 and benchmark.check is not None:
+            correct = bool(benchmark.check(out))
+        seconds.append(best)
+    exponent = fit_exponent(sizes, seconds)
+    return Result(
+        name=benchmark.name,
+        sizes=list(sizes),
+        seconds=seconds,
+        exponent=exponent,
+        max_exponent=benchmark.max_exponent,
+        passed=correct and exponent <= benchmark.max_exponent,
+        correct=correct,
+    )
+
+
+def fit_exponent(sizes : list, seconds : list) -> float:
+    """The least squares slope of log(seconds) against log(size)"""
+    xs = [math.log(n) for n in sizes]
+    ys = [math.log(max(t, 1e-9)) for t in seconds]
+    mx = sum(xs) / len(xs)
+    my = sum(ys) / len(ys)
+    return sum((x - mx) * (y - my) for x, y in zip(xs, ys)) / sum((x - mx) ** 2 for x in xs)
@@ -8,13 +8,13 @@ polynomials, while 'x' is the formal variable of the power series.
 See https://en.wikipedia.org/wiki/Legendre_polynomials
 
 To draw the nth polynomial, we just pick out the nth coefficient of the power
-series, and substitute out the symbolic term t.
+series, and compile it into a vectorised function of the symbolic term t.
 """
 import numpy as np
 import matplotlib.pyplot as plt
 
 from wilf.powerseries import PowerSeries
-from wilf.symbolics import Symbol
+from wilf.symbolics import Symbol, lambdify
 
 # t is an algebraic symbol. x is the formal argument of a power series
 t = Symbol('t')
@@ -28,7 +28,7 @@ legendre = 1/((1 - 2 * x * t + x**2)**0.5)
 # Draw the first few polynomials
 xs = np.linspace(-1, 1, 50)
 for n in range(1, 9):
-    ys = [legendre.f(n).subs({t:xv}) for xv in xs]
+    ys = lambdify(t, legendre.f(n))(xs)
     plt.plot(xs, ys, label=f'n={n}')
 plt.legend()
 plt.show()
\ No newline at end of file
@@ -0,0 +1,5 @@
+from wilf.powerseries import PowerSeries
+
+def dense(s):
+    """The same series as s, as a plain leaf"""
+    return PowerSeries(lambda i: s.f(i), ring=s.ring)
@@ -0,0 +1,11 @@
+from pytest import approx, mark
+from benchmarks.suite import BENCHMARKS, fit_exponent
+
+@mark.parametrize('benchmark', [b for b in BENCHMARKS if b.check is not None], ids=lambda b: b.name)
+def test_workload_is_correct(benchmark):
+    assert benchmark.check(benchmark.setup(benchmark.sizes[0])())
+
+def test_fit_exponent():
+    sizes = [10, 20, 40, 80]
+    assert fit_exponent(sizes, [3e-6 * n ** 2 for n in sizes]) == approx(2)
+    assert fit_exponent(sizes, [1.0] * 4) == approx(0, abs=1e-12)
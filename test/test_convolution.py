@@ -0,0 +1,76 @@
+from fractions import Fraction
+from math import factorial
+import warnings
+from pytest import approx, importorskip
+from wilf import convolution
+from wilf.convolution import schoolbook, karatsuba, convolve, fft_convolve
+
+def test_schoolbook_truncates():
+    assert schoolbook([1, 2], [3, 4], 2) == [3, 10]
+
+def test_schoolbook_full():
+    assert schoolbook([1, 2], [3, 4], 3) == [3, 10, 8]
+
+def test_karatsuba_matches_schoolbook():
+    a = [(7 * i + 3) % 11 - 5 for i in range(100)]
+    b = [(5 * i + 1) % 13 - 6 for i in range(100)]
+    assert karatsuba(a, b) == schoolbook(a, b, 199)
+
+def test_convolve_fractions_are_exact():
+    a = [Fraction(1, i + 1) for i in range(70)]
+    assert convolve(a, a, 70) == schoolbook(a, a, 70)
+
+def test_convolve_floats():
+    a = [1 / (i + 1) for i in range(70)]
+    assert convolve(a, a, 70) == approx(schoolbook(a, a, 70))
+
+def test_fft_convolve_matches_schoolbook():
+    importorskip('numpy')
+    a = [1 / (i + 1) for i in range(300)]
+    values, errors = fft_convolve(a, a, 300)
+    assert values == approx(schoolbook(a, a, 300), rel=1e-12)
+    assert max(errors) < 1e-12
+
+def test_fft_convolve_complex():
+    importorskip('numpy')
+    a = [complex(1 / (i + 1), (-1) ** i / (i + 2)) for i in range(300)]
+    values, errors = fft_convolve(a, a, 300)
+    assert values == approx(schoolbook(a, a, 300), rel=1e-12)
+
+def test_fft_convolve_with_zero_leading_coefficients(monkeypatch):
+    importorskip('numpy')
+    a = [0.0] + [1 / (i + 1) for i in range(299)]
+    b = [0.0, 0.0] + [(-1) ** i / (i + 2) for i in range(298)]
+    values, errors = fft_convolve(a, b, 300)
+    assert values[:3] == [0.0, 0.0, 0.0]
+    assert values == approx(schoolbook(a, b, 300), rel=1e-12)
+    assert max(errors) < 1e-12
+    # Coefficients with no terms are exactly zero, rather than noise
+    c = [1.0 if i % 3 == 0 else 0.0 for i in range(300)]
+    values, errors = fft_convolve(c, c, 300)
+    assert values[1] == values[2] == 0.0
+    assert max(errors) < 1e-12
+    # so convolve keeps the FFT result, rather than falling back
+    expected = schoolbook(a, b, 300)
+    monkeypatch.setattr(convolution.np, 'convolve', None)
+    assert convolve(a, b, 300) == approx(expected, rel=1e-12)
+
+def test_fft_convolve_with_large_coefficients():
+    importorskip('numpy')
+    a = [1e160 / (i + 1) for i in range(300)]
+    b = [1e-160 * (1 + 1 / (i + 2)) for i in range(300)]
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        values, errors = fft_convolve(a, b, 300)
+    assert values == approx(schoolbook(a, b, 300), rel=1e-12)
+    assert max(errors) < 1e-12
+
+def test_fft_error_estimate_flags_small_coefficients(monkeypatch):
+    importorskip('numpy')
+    a = [1 / factorial(i) for i in range(150)]
+    values, errors = fft_convolve(a, a, 150)
+    assert errors[0] < 1e-12
+    assert errors[-1] > 1
+    # convolve notices and falls back to the direct product
+    monkeypatch.setattr(convolution, 'FFT_CUTOFF', 100)
+    assert convolve(a, a, 150)[-1] == approx(2 ** 149 / factorial(149), rel=1e-12)
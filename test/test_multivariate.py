@@ -0,0 +1,69 @@
+from fractions import Fraction
+from pytest import approx, importorskip, raises
+from wilf.multivariate import MultivariatePolynomial
+from wilf.powerseries import PowerSeries
+from wilf.symbolics import Symbol, Sum, Product, Power
+
+t = MultivariatePolynomial.symbol('t')
+u = MultivariatePolynomial.symbol('u')
+x = PowerSeries.x
+
+def test_like_terms_are_collected():
+    p = t * t + t * t
+    assert p.terms == {(2,): 2}
+
+def test_constant_results_are_numbers():
+    assert t - t == 0
+    assert (t + 1) - t == 1
+    assert 0 * t == 0
+
+def test_multivariate_product():
+    p = (t + u) ** 2
+    assert p.symbols == (Symbol('t'), Symbol('u'))
+    assert p.terms == {(2, 0): 1, (1, 1): 2, (0, 2): 1}
+
+def test_division_is_exact():
+    p = t / 3
+    assert p.terms == {(1,): Fraction(1, 3)}
+
+def test_floats_become_exact_rationals():
+    p = 0.5 * t
+    assert p.terms == {(1,): Fraction(1, 2)}
+
+def test_subs_horner():
+    p = 3 * t**2 - 2 * t * u + 1
+    assert p.subs({Symbol('t'): 2, Symbol('u'): 5}) == -7
+
+def test_subs_partial():
+    p = t * u + t
+    assert p.subs({Symbol('u'): 2}) == 3 * t
+
+def test_subs_numpy():
+    np = importorskip('numpy')
+    p = t**3 - t
+    xs = np.linspace(-1, 1, 11)
+    assert p.subs({Symbol('t'): xs}) == approx(xs**3 - xs)
+    with raises(TypeError, match='lambdify'):
+        (t * u).subs({Symbol('t'): xs})
+
+def test_expression_roundtrip():
+    s = Symbol('t')
+    expr = Sum(1, Product(3, Power(s, 2)), s)
+    p = MultivariatePolynomial.from_expression(expr)
+    assert p == 3 * t**2 + t + 1
+    assert MultivariatePolynomial.from_expression(p.to_expression()) == p
+
+def test_non_polynomial_expression():
+    with raises(ValueError):
+        MultivariatePolynomial.from_expression(1 / Symbol('t'))
+
+def test_geometric_series():
+    a = 1 / (1 - t * x)
+    assert [a.f(i) for i in range(4)] == [1, t, t**2, t**3]
+
+def test_legendre_coefficients_are_exact_and_small():
+    legendre = 1 / ((1 - 2 * x * t + x**2)**0.5)
+    assert legendre.f(2) == Fraction(3, 2) * t**2 - Fraction(1, 2)
+    assert legendre.f(3) == Fraction(5, 2) * t**3 - Fraction(3, 2) * t
+    assert len(legendre.f(30).terms) == 16
+    assert legendre.f(30).subs({Symbol('t'): 1}) == 1
@@ -0,0 +1,46 @@
+from pytest import importorskip
+from wilf import ntt
+from wilf.convolution import schoolbook, integer_convolve, modular_convolve
+from wilf.powerseries import PowerSeries
+from wilf.rings import ZZ, GF
+
+importorskip('numpy')
+
+x = PowerSeries.x
+
+def test_convolve_mod_ntt_prime():
+    p = 998244353
+    a = [(i * i * 7919) % p for i in range(300)]
+    b = [(i * 104729 + 17) % p for i in range(300)]
+    assert ntt.convolve_mod(a, b, 300, p) == [c % p for c in schoolbook(a, b, 300)]
+
+def test_convolve_mod_other_prime():
+    p = 10 ** 9 + 7
+    a = [(i * i * 7919) % p for i in range(200)]
+    b = [(p - 1 - i) for i in range(200)]
+    assert ntt.convolve_mod(a, b, 200, p) == [c % p for c in schoolbook(a, b, 200)]
+
+def test_convolve_integers_signed_and_large():
+    a = [(-1) ** i * 3 ** i for i in range(150)]
+    b = [i - 75 for i in range(150)]
+    assert ntt.convolve_integers(a, b, 150) == schoolbook(a, b, 150)
+
+def test_convolve_integers_zeros():
+    assert ntt.convolve_integers([0] * 100, [1] * 100, 100) == [0] * 100
+
+def test_dispatch_matches_schoolbook():
+    a = [(13 * i) % 29 - 14 for i in range(128)]
+    assert integer_convolve(a, a, 128) == schoolbook(a, a, 128)
+    assert modular_convolve([c % 7 for c in a], [c % 7 for c in a], 128, 7) == \
+        [c % 7 for c in schoolbook(a, a, 128)]
+
+def test_long_products_over_rings():
+    p = 998244353
+    fib = [0, 1]
+    while len(fib) < 502:
+        fib.append(fib[-1] + fib[-2])
+    expected = sum(fib[j + 1] * fib[501 - j] for j in range(501))
+    f = (1 / (1 - x - x**2)).over(ZZ)
+    assert (f * f).f(500) == expected
+    g = (1 / (1 - x - x**2)).over(GF(p))
+    assert (g * g).f(500) == expected % p
@@ -0,0 +1,16 @@
+from pytest import approx, importorskip
+from wilf import parallel
+from wilf.powerseries import PowerSeries
+
+x = PowerSeries.x
+
+def test_coefficients():
+    series = [1 / (1 - k * x) for k in range(4)]
+    assert parallel.coefficients(series, 5, workers=2) == [[k ** i for i in range(5)] for k in range(4)]
+
+def test_coefficients_through_shared_memory():
+    np = importorskip('numpy')
+    series = [(1 - 0.5 * k * x) ** -0.5 for k in range(3)]
+    out = parallel.coefficients(series, 100, workers=2, dtype=float)
+    assert out.shape == (3, 100)
+    assert out[2].tolist() == approx(series[2].coefficients(100))
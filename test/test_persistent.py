@@ -0,0 +1,55 @@
+from fractions import Fraction
+from pytest import approx, importorskip
+from wilf.persistent import DiskCache
+from wilf.powerseries import PowerSeries
+from wilf.rings import QQ, GF
+
+x = PowerSeries.x
+
+def fibonacci_denominator(i):
+    return (1, -1, -1)[i] if i < 3 else 0
+
+def test_key_depends_on_definition_and_ring(tmp_path):
+    store = DiskCache(tmp_path)
+    a = 1 / (1 - 2 * x)
+    assert store.key(a) == store.key(1 / (1 - 2 * PowerSeries.x))
+    assert store.key(a) != store.key(1 / (1 - 3 * x))
+    assert store.key(a) != store.key(a.over(GF(7)))
+
+def test_numeric_prefixes_are_memory_mapped(tmp_path):
+    np = importorskip('numpy')
+    store = DiskCache(tmp_path)
+    a = (1 - 0.5 * x)**-0.5
+    expected = a.coefficients(300)
+    assert store.coefficients(a, 200).tolist() == approx(expected[:200])
+    stored = DiskCache(tmp_path).stored((1 - 0.5 * PowerSeries.x)**-0.5)
+    assert isinstance(stored, np.memmap)
+    # Everything computed so far is stored
+    assert len(stored) == 300
+
+def test_prefixes_are_extended_in_place(tmp_path):
+    importorskip('numpy')
+    store = DiskCache(tmp_path)
+    # Leaves aren't shared, so a and b are separate objects with the same key
+    a = 1 / PowerSeries(fibonacci_denominator)
+    store.coefficients(a, 50)
+    b = 1 / PowerSeries(fibonacci_denominator)
+    assert store.load(b) == 50
+    assert len(b._coeffs) == 50
+    assert store.coefficients(b, 80).tolist() == a.coefficients(80)
+    assert len(store.stored(a)) == 80
+
+def test_exact_coefficients_are_pickled(tmp_path):
+    store = DiskCache(tmp_path)
+    a = (1 / (1 - x - x**2)).over(QQ) / 3
+    coeffs = store.coefficients(a, 120)
+    assert coeffs[2] == Fraction(2, 3)
+    assert coeffs[119] > 2 ** 64
+    assert store.stored(a) == coeffs
+
+def test_clear(tmp_path):
+    store = DiskCache(tmp_path)
+    a = 1 / (1 - x)
+    store.coefficients(a, 10)
+    store.clear()
+    assert len(store.stored(a)) == 0
@@ -1,6 +1,13 @@
-from pytest import approx
-from wilf.powerseries import PowerSeries, exp, derivative, integral
+from pytest import approx, importorskip, raises
+import gc
+import math
+import weakref
+from fractions import Fraction
+from wilf.powerseries import PowerSeries, Polynomial, exp, log, sin, cos, atan, derivative, integral
+from wilf.rings import ZZ
+from wilf.symbolics import Symbol
 from wilf.utils import factorial
+from test.helpers import dense
 
 x = PowerSeries.x
 
@@ -38,4 +45,193 @@ def test_exp():
     e_to_x = exp(x)
     for coef_ix in range(20):
         assert e_to_x.f(coef_ix) == approx(1 / factorial(coef_ix))
-        
\ No newline at end of file
+        
+def test_coefficients_are_generated_once_in_order():
+    calls = []
+    def f(i):
+        calls.append(i)
+        return i
+    a = PowerSeries(f)
+    assert a.f(5) == 5
+    assert a.f(2) == 2
+    assert a.f(7) == 7
+    assert calls == list(range(8))
+
+def test_negative_index_is_zero():
+    assert x.f(-1) == 0
+
+def test_dropped_series_are_freed_without_the_cyclic_collector():
+    gc.disable()
+    try:
+        a = PowerSeries(lambda i: i)
+        b = exp(a) * (1 - a)
+        b.coefficients(100)
+        refs = [weakref.ref(a), weakref.ref(b)]
+        del a, b
+        assert all(ref() is None for ref in refs)
+    finally:
+        gc.enable()
+
+def test_mul_block_matches_online():
+    b = lambda i: i + 1
+    online = dense(Polynomial([1, 1, 3])) * PowerSeries(b)
+    online_coeffs = [online.f(i) for i in range(300)]
+    block = dense(Polynomial([1, 1, 3])) * PowerSeries(b)
+    assert block is not online
+    assert block.f(299) == online_coeffs[299]
+    assert [block.f(i) for i in range(300)] == online_coeffs
+
+def test_mul_block_reuses_prefix():
+    c = PowerSeries(lambda i: i) * PowerSeries(lambda i: 1)
+    assert c.f(10) == 55
+    assert c.f(500) == 500 * 501 // 2
+
+def test_inverse_recurrence():
+    a = 1 - x - x**2
+    fib = a.inverse()
+    assert [fib.f(i) for i in range(8)] == [1, 1, 2, 3, 5, 8, 13, 21]
+
+def test_inverse_newton_block_matches_recurrence():
+    a = lambda i: i + 1
+    online = PowerSeries(a).inverse()
+    online_coeffs = [online.f(i) for i in range(200)]
+    assert online_coeffs[:3] == [1, -2, 1]
+    block = PowerSeries(a).inverse()
+    assert block is not online
+    assert block.f(199) == online_coeffs[199]
+    assert [block.f(i) for i in range(200)] == online_coeffs
+
+def test_inverse_non_unit_constant():
+    a = 2 - x
+    b = 1 / a
+    assert [b.f(i) for i in range(4)] == approx([1/2, 1/4, 1/8, 1/16])
+
+def test_division():
+    a = (1 + x) / (1 - x)
+    assert [a.f(i) for i in range(4)] == [1, 2, 2, 2]
+
+def test_exp_constant_term():
+    e = exp(1 + x)
+    for coef_ix in range(10):
+        assert e.f(coef_ix) == approx(math.e / factorial(coef_ix))
+
+def test_exp_newton_block_matches_recurrence():
+    online = exp(dense(Polynomial([0, 1, -0.5])))
+    online_coeffs = [online.f(i) for i in range(150)]
+    block = exp(dense(Polynomial([0, 1, -0.5])))
+    assert block is not online
+    assert block.f(149) == approx(online_coeffs[149], abs=1e-12)
+    assert [block.f(i) for i in range(150)] == approx(online_coeffs, abs=1e-12)
+
+def test_log():
+    l = log(1 + x)
+    assert [l.f(i) for i in range(5)] == approx([0, 1, -1/2, 1/3, -1/4])
+
+def test_log_newton_block():
+    l = log(1 / (1 - x))
+    assert l.f(200) == approx(1 / 200)
+    assert l.f(100) == approx(1 / 100)
+
+def test_log_exp_roundtrip():
+    a = 2 * x + 3 * x**2
+    assert equal_upto_o_approx(log(exp(a)), a)
+
+def test_sin_cos_are_real():
+    s, c = sin(x), cos(x)
+    for i in range(10):
+        assert isinstance(s.f(i), (int, float))
+        assert isinstance(c.f(i), (int, float))
+    assert [s.f(i) for i in range(6)] == approx([0, 1, 0, -1/6, 0, 1/120])
+    assert [c.f(i) for i in range(6)] == approx([1, 0, -1/2, 0, 1/24, 0])
+
+def test_sin_squared_plus_cos_squared():
+    a = x + x**3
+    s, c = sin(a), cos(a)
+    assert equal_upto_o_approx(s * s + c * c, PowerSeries.one)
+
+def test_atan():
+    a = atan(x)
+    assert [a.f(i) for i in range(6)] == approx([0, 1, 0, -1/3, 0, 1/5])
+
+def equal_upto_o_approx(a, b, o=10):
+    return all(a.f(order) == approx(b.f(order), abs=1e-12) for order in range(o))
+
+def test_sqrt_catalan():
+    # (1 - sqrt(1 - 4x)) / 2x generates the Catalan numbers
+    s = (1 - 4*x)**0.5
+    assert [s.f(i) for i in range(1, 7)] == approx([-2, -2, -4, -10, -28, -84])
+
+def test_real_power_newton_block_matches_recurrence():
+    online = dense(Polynomial([1, -0.5, 0, 0.25]))**-1.5
+    online_coeffs = [online.f(i) for i in range(200)]
+    block = dense(Polynomial([1, -0.5, 0, 0.25]))**-1.5
+    assert block is not online
+    assert block.f(199) == approx(online_coeffs[199], abs=1e-12)
+    assert [block.f(i) for i in range(200)] == approx(online_coeffs, abs=1e-12)
+
+def test_large_integer_power_is_exact():
+    b = (1 + x)**20
+    assert [b.f(i) for i in range(4)] == [1, 20, 190, 1140]
+    assert all(isinstance(b.f(i), int) for i in range(25))
+    assert b.f(21) == 0
+
+def test_large_integer_power_of_symbolic_series_is_exact():
+    t = Symbol('t')
+    a = PowerSeries(lambda i: t if i else 1)
+    below = a ** (PowerSeries.MILLER_CUTOFF - 1) * a
+    at = a ** PowerSeries.MILLER_CUTOFF
+    assert at.f(1) == 16 * t
+    for i in range(2, 6):
+        assert at.f(i).subs({t: 3}) == below.f(i).subs({t: 3})
+        assert isinstance(at.f(i).subs({t: 3}), int)
+    # Over SR, only series whose terms are known to be numbers take the recurrence
+    assert type(PowerSeries(lambda i: i + 1) ** 16).__name__ == 'CauchyProduct'
+    assert type((1 - x.shift(99)) ** 16).__name__ == 'RealPower'
+    assert type(PowerSeries(lambda i: i + 1, ring=ZZ) ** 16).__name__ == 'RealPower'
+
+def test_negative_integer_power():
+    b = (1 - x)**-2
+    assert [b.f(i) for i in range(5)] == [1, 2, 3, 4, 5]
+
+def test_real_power_needs_constant_term():
+    with raises(ZeroDivisionError):
+        x**0.5
+
+def test_coefficients_prefix():
+    a = 1 / (1 - x - x**2)
+    assert a.coefficients(8) == [1, 1, 2, 3, 5, 8, 13, 21]
+    assert a.coefficients(3) == [1, 1, 2]
+    assert a.coefficients(0) == []
+
+def test_coefficients_match_online():
+    def build():
+        a = PowerSeries(lambda i: i * i - 3)
+        b = PowerSeries(lambda i: (-1) ** i)
+        return integral(derivative(3 * a - b / 2) + a * b) - 1
+    s = build()
+    t = build()
+    assert s is not t
+    assert s.coefficients(300) == [t.f(i) for i in range(300)]
+
+def test_take():
+    np = importorskip('numpy')
+    a = (1 - 2 * x)**-1
+    assert a.take(5).tolist() == [1, 2, 4, 8, 16]
+    big = a.take(80)
+    assert big.dtype == object and big[79] == 2 ** 79
+    assert (1 / (1 - 0.5 * x)).take(3).dtype == np.float64
+
+def test_call():
+    assert (1 / (1 - x - x**2))(Fraction(1, 3), precision=5) == Fraction(140, 81)
+    assert exp(x)(1.0) == approx(math.e)
+    assert exp(x)(1.0, precision=2, tol=1e-15) == approx(math.e, rel=1e-15)
+
+def test_call_on_arrays():
+    np = importorskip('numpy')
+    xs = np.linspace(-1, 1, 101) + 0.5j
+    assert exp(x)(xs, tol=1e-14) == approx(np.exp(xs), abs=1e-13)
+    assert (1 / (1 - x))(np.array([0.5, -0.5]), tol=1e-12) == approx([2, 2 / 3])
+
+def test_call_outside_radius_of_convergence():
+    with raises(ValueError):
+        (1 / (1 - x))(2.0, tol=1e-10)
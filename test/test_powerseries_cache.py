@@ -0,0 +1,58 @@
+import gc
+from fractions import Fraction
+from wilf.powerseries import PowerSeries
+
+x = PowerSeries.x
+
+def test_hits_and_misses():
+    PowerSeries.cache.reset_stats()
+    a = PowerSeries(lambda i: i)
+    a.f(10)
+    a.f(3)
+    assert PowerSeries.cache.misses == 1
+    assert PowerSeries.cache.hits == 1
+
+def test_bytes_are_released_with_the_series():
+    # Without the cyclic collector, so that only reference counting frees a
+    gc.disable()
+    try:
+        before = PowerSeries.cache.bytes
+        a = PowerSeries(lambda i: float(i))
+        a.f(1000)
+        assert PowerSeries.cache.bytes > before
+        del a
+        assert PowerSeries.cache.bytes <= before
+    finally:
+        gc.enable()
+
+def test_powers_are_memoised():
+    a = 1 + x
+    PowerSeries.cache.reset_stats()
+    p = a**3
+    assert a**3 is p
+    assert PowerSeries.cache.pow_hits == 1
+
+def test_powers_are_memoised_by_type():
+    a = PowerSeries(lambda i: i + 1)
+    exact = a ** Fraction(1, 2)
+    approximate = a ** 0.5
+    assert approximate is not exact
+    assert isinstance(approximate.f(3), float)
+    assert isinstance(exact.f(3), Fraction)
+    assert a ** 2 is not a ** 2.0
+
+def test_budget_evicts_and_recomputes():
+    cache = PowerSeries.cache
+    old_budget = cache.budget
+    cache.budget = 0
+    try:
+        a = 1 / (1 - x - x**2)
+        assert a.f(30) == 1346269
+        evictions = cache.evictions
+        b = PowerSeries(lambda i: i)
+        b.f(100)
+        assert cache.evictions > evictions
+        assert a._coeffs == []
+        assert a.f(30) == 1346269
+    finally:
+        cache.budget = old_budget
@@ -0,0 +1,89 @@
+from fractions import Fraction
+import sys
+from wilf.powerseries import PowerSeries, exp, sin, cos, derivative, integral
+from wilf.multivariate import MultivariatePolynomial
+
+x = PowerSeries.x
+
+def test_identical_nodes_are_shared():
+    a = 1 / (1 - x)
+    assert a * x is x * a
+    assert a + x is x + a
+    assert exp(a) is exp(a)
+    assert derivative(a, 2) is derivative(a, 2)
+    assert cos(x) is sin(x).cosine
+
+def test_constants_are_compared_by_type():
+    a = 1 / (1 - x)
+    assert a * 2 is a * 2
+    assert a * 2 is not a * 2.0
+    assert isinstance((a * 2).f(3), int)
+
+def test_linear_chains_are_fused():
+    a = PowerSeries(lambda i: i)
+    b = PowerSeries(lambda i: i * i)
+    u = 3 * a - b
+    v = -u + 2 * (a + 1) - 5
+    assert v.coefficients(6) == [-3, 0, 2, 6, 12, 20]
+    # The intermediate linear nodes were never filled
+    assert u._coeffs == []
+
+def test_shared_linear_nodes_are_fused_once():
+    # 2^200 paths from the top to the leaf, which must not be walked one by one
+    a = PowerSeries(lambda i: i)
+    s = a
+    for _ in range(200):
+        s = s + s
+    assert s._fused() == ([(2 ** 200, a)], 0)
+    assert s.f(3) == 3 * 2 ** 200
+
+def test_fused_nodes_reuse_filled_buffers():
+    a = PowerSeries(lambda i: Fraction(1, i + 1))
+    u = a + a
+    assert u.coefficients(3) == [2, 1, Fraction(2, 3)]
+    v = u - a
+    assert v.coefficients(3) == [1, Fraction(1, 2), Fraction(1, 3)]
+
+def test_shift():
+    a = 1 / (1 - 2 * x)
+    assert a.shift(2).coefficients(5) == [0, 0, 1, 2, 4]
+    assert a.shift(-2).coefficients(3) == [4, 8, 16]
+
+def test_explain():
+    a = 1 / PowerSeries(lambda i: i + 1)
+    b = a * a + (a + 1)
+    text = b.explain(1000)
+    assert text.splitlines()[0].startswith('#1 Addition')
+    assert 'CauchyProduct over SR [0 buffered, block]' in text
+    assert 'PlusConstant(c=1) over SR [0 buffered, fused]' in text
+    assert '(shared)' in text
+
+def test_explain_sparse_recurrences_are_online():
+    for s in (1 / (1 - x - x ** 2), exp(x ** 3), (1 - 4 * x) ** 0.5):
+        assert s.explain(1000).splitlines()[0].endswith('[0 buffered]')
+    assert exp(PowerSeries(lambda i: i)).explain(1000).splitlines()[0].endswith('[0 buffered, block]')
+
+def test_deep_chains_do_not_recurse():
+    depth = 3 * sys.getrecursionlimit()
+    s = 1 + x
+    for i in range(depth):
+        s = s * (1 + x) if i % 2 else integral(derivative(s)) + 1
+    assert s.f(2) == (depth // 2 + 1) * (depth // 2) // 2
+    r = 1 - x
+    for i in range(depth):
+        r = 1 / r
+    assert r.coefficients(3) == ([1, 1, 1] if depth % 2 else [1, -1, 0])
+
+def test_hidden_dependencies_are_scheduled():
+    depth = 3 * sys.getrecursionlimit()
+    s = x
+    for i in range(depth):
+        s = s * (1 + x)
+    wrapped = PowerSeries(lambda i: 2 * s.f(i))
+    assert wrapped.f(2) == 2 * depth
+
+def test_integer_powers_by_squaring():
+    t = MultivariatePolynomial.symbol('t')
+    a = (t + x) ** (2 ** 12 + 1)
+    assert a.f(1) == (2 ** 12 + 1) * t ** (2 ** 12)
+    assert (t + x) ** (2 ** 11) is (t + x) ** (2 ** 11)
@@ -0,0 +1,48 @@
+import pickle
+import sys
+from fractions import Fraction
+from pytest import raises
+from wilf.powerseries import PowerSeries, exp, sin, cos, derivative, integral
+from wilf.rings import SR, QQ, GF
+
+x = PowerSeries.x
+
+def squares(i):
+    return i * i
+
+def roundtrip(a):
+    return pickle.loads(pickle.dumps(a))
+
+def test_leaf_series():
+    a = roundtrip(PowerSeries(squares))
+    assert a.coefficients(4) == [0, 1, 4, 9]
+    assert roundtrip(x).coefficients(3) == [0, 1, 0]
+
+def test_lambdas_cant_be_pickled():
+    with raises(Exception):
+        pickle.dumps(PowerSeries(lambda i: i))
+
+def test_derived_series():
+    a = sin(x) * cos(x) + exp(PowerSeries(squares)) / 3 - 1
+    b = roundtrip(a)
+    assert b is not a
+    assert b.coefficients(10) == a.coefficients(10)
+
+def test_shared_nodes_stay_shared():
+    a = 1 / (1 - x)
+    b, c = roundtrip((a * a, a + 1))
+    assert b.a is c.a
+
+def test_rings():
+    assert roundtrip(SR) is SR
+    assert roundtrip(GF(7)) is GF(7)
+    a = roundtrip((1 / (1 - 2 * x)).over(GF(7)))
+    assert a.ring is GF(7)
+    assert a.coefficients(4) == [1, 2, 4, 1]
+    assert roundtrip(PowerSeries(squares).over(QQ) / 2).f(3) == Fraction(9, 2)
+
+def test_deep_graphs():
+    s = 1 + x
+    for i in range(3 * sys.getrecursionlimit()):
+        s = s * (1 + x) if i % 2 else integral(derivative(s)) + 1
+    assert roundtrip(s).f(2) == s.f(2)
@@ -0,0 +1,145 @@
+import pickle
+from fractions import Fraction
+from pytest import importorskip, raises
+from wilf.powerseries import PowerSeries, Polynomial, PolynomialProduct, SparseSeries, SparseQuotient, exp
+from wilf.rings import QQ, GF, RR, ZZ
+from test.helpers import dense
+
+x = Polynomial.x
+
+def test_construction():
+    p = Polynomial([1, 2, 0, 3, 0, 0])
+    assert p.coeffs == [1, 2, 0, 3]
+    assert p.degree == 3
+    assert p.terms == {0: 1, 1: 2, 3: 3}
+    assert p.coefficients(6) == [1, 2, 0, 3, 0, 0]
+    assert Polynomial().degree == -1
+    assert Polynomial([1, 2], QQ).coeffs == [1, 2]
+    assert Polynomial([Fraction(4, 2)], ZZ).coeffs == [2]
+
+def test_repr():
+    assert repr((1 + x) ** 3) == '<1 + 3x + 3x² + x³>'
+    assert repr(Polynomial()) == '<0>'
+
+def test_arithmetic_stays_polynomial():
+    p = 1 + 2 * x - x ** 3
+    q = 3 - x
+    assert isinstance(p, Polynomial)
+    assert (p + q).coeffs == [4, 1, 0, -1]
+    assert (p - p).degree == -1
+    assert (q - p).coeffs == [2, -3, 0, 1]
+    assert (p * q).coeffs == [3, 5, -2, -3, 1]
+    assert (p / 2).coeffs == [Fraction(1, 2), 1, 0, Fraction(-1, 2)]
+    assert p.shift(2).coeffs == [0, 0, 1, 2, 0, -1]
+    assert p.shift(-1).coeffs == [2, 0, -1]
+
+def test_sparse_operands():
+    s = PowerSeries.x ** 5
+    assert isinstance(s + x, Polynomial)
+    assert (x + s).coeffs == (s + x).coeffs == [0, 1, 0, 0, 0, 1]
+    assert (s - x).coeffs == [0, -1, 0, 0, 0, 1]
+    assert (s * (1 + x)).coeffs == [0, 0, 0, 0, 0, 1, 1]
+
+def test_high_degree_sparse_operands_stay_sparse():
+    s = PowerSeries.x ** 10 ** 6
+    p = 1 + 2 * x
+    assert isinstance(p * s, SparseSeries) and (p * s).terms == {10 ** 6: 1, 10 ** 6 + 1: 2}
+    assert (s * p).terms == (p * s).terms
+    assert (p + s).terms == {0: 1, 1: 2, 10 ** 6: 1}
+    assert (p - s).terms == {0: 1, 1: 2, 10 ** 6: -1}
+    assert (s - p).terms == {0: -1, 1: -2, 10 ** 6: 1}
+
+def test_large_product_is_exact():
+    p = (1 + x).over(ZZ) ** 200
+    assert p.degree == 200
+    assert p.f(100) == 90548514656103281165404177077484163874504589675413336841320
+    assert (p * p).coeffs == ((1 + x).over(ZZ) ** 400).coeffs
+
+def test_product_with_series():
+    a = PowerSeries(lambda i: i * i + 1)
+    p = (2 - x + 3 * x ** 4) ** 5
+    b = a * p
+    assert isinstance(b, PolynomialProduct)
+    assert p * a is b
+    # Online, then a block
+    expected = (a * dense(p)).coefficients(500)
+    assert [b.f(i) for i in range(10)] == expected[:10]
+    assert b.coefficients(500) == expected
+
+def test_product_with_series_over_a_ring():
+    a = exp(PowerSeries.x.over(QQ))
+    p = (1 - x).over(QQ) ** 3
+    assert (a * p).coefficients(200) == (a * dense(p)).coefficients(200)
+
+def test_quotient_and_recurrences():
+    a = PowerSeries(lambda i: i + 1)
+    p = 1 - x - x ** 2
+    assert isinstance(a / p, SparseQuotient)
+    assert (a / p).coefficients(30) == (a / dense(p)).coefficients(30)
+    assert (1 / p).coefficients(10) == [1, 1, 2, 3, 5, 8, 13, 21, 34, 55]
+    assert (p ** 0.5).coefficients(20) == (dense(p) ** 0.5).coefficients(20)
+
+def test_divmod():
+    X = x.over(QQ)
+    f = 3 * X ** 5 - X ** 2 + 7
+    g = 2 * X ** 2 + X - 1
+    q, r = divmod(f, g)
+    assert r.degree < g.degree
+    assert (q * g + r - f).degree == -1
+    assert f // g is not q
+    assert (f // g).coeffs == q.coeffs
+    assert (f % g).coeffs == r.coeffs
+    assert divmod(g, f)[0].degree == -1
+    assert divmod(g, f)[1].coeffs == g.coeffs
+
+def test_long_division_mod_p():
+    X = x.over(GF(101))
+    f = (1 + 3 * X) ** 300 + X
+    g = (2 + X) ** 90 - 1
+    q, r = divmod(f, g)
+    assert (q * g + r).coeffs == f.coeffs
+
+def test_division_by_zero():
+    with raises(ZeroDivisionError):
+        divmod(x, Polynomial())
+
+def test_division_needs_an_invertible_leading_coefficient():
+    with raises(ValueError):
+        divmod(x.over(ZZ) ** 2, 2 * x.over(ZZ))
+
+def test_gcd():
+    X = x.over(QQ)
+    f = (X - 1) ** 2 * (X + 2) * (3 * X - 1)
+    g = (X - 1) * (X + 2) ** 3 * (X + 5)
+    assert f.gcd(g).coeffs == ((X - 1) * (X + 2)).coeffs
+    assert f.gcd(X + 7).coeffs == [1]
+    assert f.gcd(0).coeffs == (f / 3).coeffs
+
+def test_gcd_over_the_default_ring():
+    p = (x + 1) ** 3 * (x - 2)
+    q = (x + 1) ** 2 * (x + 5)
+    g = p.gcd(q)
+    assert g.coeffs == [1, 2, 1]
+    assert all(isinstance(c, (int, Fraction)) for c in g.coeffs)
+    assert (Fraction(1, 2) * x + 1).gcd(x ** 2 - 4).coeffs == [2, 1]
+    with raises(ValueError):
+        (0.5 * x + 1).gcd(x + 2)
+    with raises(ValueError):
+        x.over(RR).gcd(x)
+
+def test_gcd_needs_a_finite_series():
+    with raises(TypeError):
+        (1 + x).gcd(PowerSeries(lambda i: 1))
+
+def test_evaluation():
+    p = 1 - 2 * x + x ** 10
+    assert p(2) == 1021
+    np = importorskip('numpy')
+    assert list(p(np.array([0.0, 1.0]))) == [1.0, 0.0]
+
+def test_pickle():
+    p = (1 + x).over(QQ) ** 4 / 3
+    q = pickle.loads(pickle.dumps(p))
+    assert q.coeffs == p.coeffs and q.ring is QQ
+    b = pickle.loads(pickle.dumps(exp(PowerSeries.x) * p))
+    assert b.coefficients(10) == (exp(PowerSeries.x) * p).coefficients(10)
@@ -0,0 +1,100 @@
+import pickle
+from fractions import Fraction
+from pytest import raises
+from wilf.powerseries import PowerSeries, SparseSeries, SparseProduct, SparseQuotient, exp
+from wilf.rings import GF, QQ, ZZ
+from test.helpers import dense
+
+x = PowerSeries.x
+
+def test_x_and_one_are_sparse():
+    assert isinstance(x, SparseSeries)
+    assert isinstance(PowerSeries.one, SparseSeries)
+    assert x is PowerSeries.x
+
+def test_arithmetic_stays_sparse():
+    s = 1 - 2 * x ** 3 + x ** 100
+    assert isinstance(s, SparseSeries)
+    assert s.terms == {0: 1, 3: -2, 100: 1}
+    assert s.degree == 100
+    assert (s - s).terms == {}
+    assert (s * (1 + x)).terms == {0: 1, 1: 1, 3: -2, 4: -2, 100: 1, 101: 1}
+    assert (s.shift(2) / 2).terms == {2: Fraction(1, 2), 5: -1, 102: Fraction(1, 2)}
+
+def test_identical_sparse_series_are_shared():
+    assert 1 - x ** 5 is 1 - x ** 5
+    assert (1 + x) ** 3 is 1 + 3 * x + 3 * x ** 2 + x ** 3
+    assert 1 - x is not 1.0 - x
+
+def test_negative_exponent():
+    with raises(ValueError):
+        SparseSeries({-1: 1})
+
+def test_repr():
+    assert repr(1 - 2 * x ** 3) == '<1 - 2x³>'
+
+def test_product_with_dense_series():
+    a = PowerSeries(lambda i: i * i + 1)
+    s = 3 - x ** 2 + 5 * x ** 7
+    p = a * s
+    assert isinstance(p, SparseProduct)
+    assert s * a is p
+    assert p.coefficients(40) == (a * dense(s)).coefficients(40)
+
+def test_quotient():
+    a = PowerSeries(lambda i: i + 1)
+    s = 2 - x ** 3 + x ** 4
+    q = a / s
+    assert isinstance(q, SparseQuotient)
+    assert q.coefficients(30) == (a / dense(s)).coefficients(30)
+    assert a * (1 / s) is q
+
+def test_quotient_over_the_numerator_ring():
+    s = 3 + x
+    a = PowerSeries(lambda i: 1, ring=QQ)
+    expected = [Fraction(1, 3), Fraction(2, 9), Fraction(7, 27), Fraction(20, 81)]
+    assert (a / s).coefficients(4) == expected
+    assert all(type(c) is Fraction for c in (a / s).coefficients(4))
+    assert (a * s.inverse()).coefficients(4) == expected
+    b = PowerSeries(lambda i: 1, ring=GF(7))
+    assert (b / s).coefficients(4) == [5, 1, 0, 5]
+    assert (b * s.inverse()).coefficients(4) == [5, 1, 0, 5]
+
+def test_recurrences_only_use_the_terms():
+    s = 1 - x ** 2 - x ** 5
+    assert (1 / s).coefficients(200) == (1 / dense(s)).coefficients(200)
+    assert exp(x ** 3).coefficients(20) == exp(dense(x ** 3)).coefficients(20)
+    assert ((1 - 4 * x) ** 0.5).coefficients(20) == (dense(1 - 4 * x) ** 0.5).coefficients(20)
+
+def test_partitions():
+    p = PowerSeries.one.over(ZZ)
+    for k in range(1, 51):
+        p = p / (1 - x ** k)
+    assert p.f(50) == 204226
+
+def test_catalan():
+    c = (1 - (1 - 4 * x.over(QQ)) ** Fraction(1, 2)) / (2 * x)
+    assert c.coefficients(8) == [1, 1, 2, 5, 14, 42, 132, 429]
+
+def test_large_powers_are_dense():
+    s = (1 + x) ** 1000
+    assert not isinstance(s, SparseSeries)
+    assert s.f(2) == 499500
+
+def test_pickle():
+    s = 1 - 2 * x ** 7
+    assert pickle.loads(pickle.dumps(s)) is s
+    q = pickle.loads(pickle.dumps(PowerSeries.one / s))
+    assert q.coefficients(15) == (1 / dense(s)).coefficients(15)
+
+def test_dividing_by_a_power_of_x():
+    a = PowerSeries(lambda i: i * i)
+    assert (a.shift(2) / x ** 2).coefficients(4) == [0, 1, 4, 9]
+    assert (a / (x - x ** 2)).coefficients(5) == (a.shift(-1) / (1 - x)).coefficients(5)
+
+def test_dividing_by_a_power_of_x_needs_zero_low_terms():
+    for q in (exp(x) / x, (1 + x) / x, PowerSeries(lambda i: i) / (x ** 2 + x ** 3)):
+        with raises(ZeroDivisionError):
+            q.f(0)
+        with raises(ZeroDivisionError):
+            q.coefficients(100)
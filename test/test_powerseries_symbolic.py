@@ -1,5 +1,6 @@
 from pytest import approx
-from wilf.powerseries import PowerSeries, exp
+from wilf.powerseries import PowerSeries, exp, integral
+from wilf.symbolics import Fraction
 from wilf.utils import factorial
 from wilf.symbolics import Symbol
 
@@ -32,4 +33,10 @@ def test_legendre():
     assert legendre.f(1) == t
     assert legendre.f(2).subs({t: 0}) == -1/2
     assert legendre.f(2).subs({t: 1}) == 1
-    assert legendre.f(2).subs({t: -1}) == 1
\ No newline at end of file
+    assert legendre.f(2).subs({t: -1}) == 1
+
+def test_symbolic_division_is_exact():
+    a = PowerSeries(lambda i: t)
+    assert integral(a).coefficients(4) == [0, t, t / 2, t / 3]
+    assert (a / 3).f(0) == Fraction(t, 3)
+    assert exp(t * x).f(2) == t ** 2 / 2
@@ -0,0 +1,67 @@
+import json
+from wilf.powerseries import PowerSeries, exp
+from wilf.profiling import profile
+
+x = PowerSeries.x
+
+def test_counts_evaluations_hits_and_misses():
+    a = PowerSeries(lambda i: i + 1)
+    b = a * a
+    with profile() as p:
+        b.f(9)
+        b.f(3)
+    assert p.roots == [b]
+    assert p[b].misses == 1
+    assert p[b].hits == 1
+    assert p[b].evaluations == 10
+    assert p[a].evaluations == 10
+    assert p[a].hits > 0
+    assert p[b].peak == 10
+    assert p.seconds > 0
+
+def test_a_buffered_read_is_one_hit():
+    s = PowerSeries(lambda i: i) * PowerSeries(lambda i: 1)
+    s.coefficients(20)
+    with profile() as p:
+        assert s.coefficients(10) == [i * (i + 1) // 2 for i in range(10)]
+    assert p[s].hits == 1
+    assert p[s].misses == 0
+
+def test_not_recording_outside_the_block():
+    a = PowerSeries(lambda i: i)
+    with profile() as p:
+        pass
+    a.f(5)
+    assert a not in p
+    assert PowerSeries.cache.profiler is None
+
+def test_nested_profiles():
+    a = PowerSeries(lambda i: i)
+    b = PowerSeries(lambda i: i)
+    with profile() as outer:
+        with profile() as inner:
+            a.f(5)
+        b.f(5)
+    assert a in inner and a not in outer
+    assert b in outer and b not in inner
+
+def test_report_and_exports():
+    a = 1 / PowerSeries(lambda i: i + 1)
+    b = exp(a * a) + a
+    with profile() as p:
+        b.coefficients(200)
+    report = p.report()
+    assert report.splitlines()[0].startswith('#1 Addition')
+    assert 'Exponential' in report and '(shared)' in report
+    data = json.loads(json.dumps(p.to_dict()))
+    assert data['roots'] == [1]
+    labels = {node['id']: node['label'] for node in data['nodes']}
+    exponential = next(node for node in data['nodes'] if node['label'] == 'Exponential')
+    assert [labels[i] for i in exponential['operands']] == ['CauchyProduct']
+    assert exponential['evaluations'] == 200
+    folded = p.folded().splitlines()
+    for line in folded:
+        stack, micros = line.rsplit(' ', 1)
+        assert stack.startswith('#1 Addition')
+        assert int(micros) >= 0
+    assert any(line.rsplit(' ', 1)[0].endswith('Exponential') for line in folded)
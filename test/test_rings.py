@@ -0,0 +1,89 @@
+from fractions import Fraction
+from math import comb, factorial
+from pytest import raises
+from wilf.powerseries import PowerSeries, exp, log, integral
+from wilf.rings import SR, ZZ, QQ, RR, CC, GF, common_ring
+
+x = PowerSeries.x
+
+def catalan(n):
+    return comb(2 * n, n) // (n + 1)
+
+def test_default_ring_is_symbolic():
+    assert x.ring is SR
+    assert (x + 1).ring is SR
+
+def test_ring_is_inherited():
+    a = x.over(QQ)
+    assert (a * a + 1).ring is QQ
+    assert (a + x).ring is QQ
+    assert (1 / (1 - a)).ring is QQ
+
+def test_incompatible_rings():
+    with raises(TypeError):
+        x.over(QQ) + x.over(GF(7))
+    assert common_ring(SR, ZZ) is ZZ
+    assert common_ring(GF(7), GF(7)) == GF(7)
+
+def test_integers_stay_exact_beyond_float_precision():
+    fib = 1 / (1 - x.over(ZZ) - x.over(ZZ)**2)
+    assert fib.f(100) == 573147844013817084101
+    assert isinstance(fib.f(100), int)
+
+def test_integer_ring_rejects_inexact_division():
+    a = x.over(ZZ) + 1
+    assert (2 * a / 2).f(0) == 1
+    with raises(ValueError):
+        (a / 2).f(0)
+    with raises(ValueError):
+        exp(x.over(ZZ)).f(2)
+
+def test_rationals_are_exact():
+    e = exp(x.over(QQ))
+    assert [e.f(i) for i in range(5)] == [Fraction(1, factorial(i)) for i in range(5)]
+    assert e.f(30) == Fraction(1, factorial(30))
+
+def test_rational_square_root_gives_catalan_numbers():
+    s = (1 - 4 * x.over(QQ))**0.5
+    c = (1 - s) / 2
+    assert [c.f(i + 1) for i in range(30)] == [catalan(i) for i in range(30)]
+
+def test_rational_newton_blocks_are_exact():
+    s = (1 - 4 * x.over(QQ))**0.5
+    assert s.f(199) == -2 * catalan(198)
+    l = log(1 / (1 - x.over(QQ)))
+    assert l.f(150) == Fraction(1, 150)
+
+def test_modular_catalan():
+    p = 1000003
+    s = (1 - 4 * x.over(GF(p)))**0.5
+    c = (1 - s) / 2
+    assert [c.f(i + 1) for i in range(200)] == [catalan(i) % p for i in range(200)]
+
+def test_modular_inverse():
+    p = 101
+    a = 1 / (3 - x.over(GF(p)))
+    for i in range(10):
+        assert a.f(i) * pow(3, i + 1, p) % p == 1
+
+def test_modular_coercion_of_rationals():
+    assert GF(7).coerce(Fraction(1, 2)) == 4
+    assert (x.over(GF(7)) / 2).f(1) == 4
+
+def test_modular_division_by_fractions_and_floats():
+    a = (1 / (1 - x)).over(GF(7))
+    assert (a / Fraction(3, 2)).coefficients(3) == [3, 3, 3]
+    assert (a / 2.5).coefficients(3) == [6, 6, 6]
+    assert GF(7).inverse(Fraction(3, 2)) == 3
+
+def test_rational_division_by_floats():
+    a = (1 / (1 - x)).over(QQ)
+    assert (a / 2.5).coefficients(3) == [Fraction(2, 5)] * 3
+    assert (a / Fraction(2, 3)).coefficients(2) == [Fraction(3, 2)] * 2
+    assert QQ.inverse(0.5) == 2
+
+def test_float_and_complex_rings():
+    a = integral(x.over(RR))
+    assert all(isinstance(a.f(i), float) for i in range(4))
+    b = x.over(CC) * 1j
+    assert b.f(1) == 1j and isinstance(b.f(0), complex)
@@ -0,0 +1,33 @@
+import operator
+from itertools import islice
+from wilf.powerseries import PowerSeries
+from wilf.streams import generate, zip_with, scan, chunked, take, drop
+
+x = PowerSeries.x
+
+def test_iterating_a_series():
+    fibonacci = 1 / (1 - x - x**2)
+    assert list(islice(fibonacci, 8)) == [1, 1, 2, 3, 5, 8, 13, 21]
+
+def test_stream_computes_little_more_than_consumed():
+    a = PowerSeries(lambda i: i)
+    assert take(a.stream(), 5) == [0, 1, 2, 3, 4]
+    assert len(a._coeffs) < 10
+
+def test_stream_from_an_index():
+    a = PowerSeries(lambda i: i)
+    assert take(a.stream(3000), 3) == [3000, 3001, 3002]
+
+def test_stream_matches_coefficients():
+    a = (1 - 0.5 * x)**-0.5
+    assert take(a, 3000) == a.coefficients(3000)
+
+def test_combinators():
+    fibonacci = iter(1 / (1 - x - x**2))
+    assert take(scan(operator.add, fibonacci), 6) == [1, 2, 4, 7, 12, 20]
+    assert take(zip_with(operator.mul, generate(lambda n: n), iter(1 / (1 - 2 * x))), 4) == [0, 2, 8, 24]
+    assert take(drop(generate(lambda n: n), 5), 2) == [5, 6]
+    batches = chunked(generate(lambda n: n), 3)
+    assert next(batches) == [0, 1, 2]
+    assert next(batches) == [3, 4, 5]
+    assert list(chunked(range(5), 2)) == [[0, 1], [2, 3], [4]]
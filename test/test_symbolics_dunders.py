@@ -44,7 +44,7 @@ def test_1_over_2():
     assert x / 2 == Fraction(x, 2)
 
 def test_product_of_fractions():
-    assert (x / y) * (z / 4) == Product(Fraction(x, y), Fraction(z, 4))
+    assert (x / y) * (z / 4) == Fraction(Product(x, z), Product(4, y))
 
 def test_rmul():
     assert 2 * x == Product(2, x)
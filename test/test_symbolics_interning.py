@@ -0,0 +1,44 @@
+import pickle
+from pytest import raises
+from wilf.symbolics import Sum, Product, Fraction, Power, Symbol
+
+x = Symbol('x')
+y = Symbol('y')
+
+def test_symbols_are_interned():
+    assert Symbol('x') is x
+
+def test_equal_expressions_are_identical():
+    assert Sum(1, Product(2, x)) is Sum(1, Product(2, x))
+    assert Power(x, 2) is Power(x, 2)
+    assert Fraction(x, y) is Fraction(x, y)
+    assert (x + y) * 2 is (x + y) * 2
+
+def test_numbers_keep_their_type():
+    assert Sum(1, x) is not Sum(1.0, x)
+    assert type(Sum(1.0, x).terms[0]) is float
+
+def test_flattening_is_interned():
+    assert Sum(Sum(1, x), y) is Sum(1, x, y)
+
+def test_expressions_are_immutable():
+    with raises(AttributeError):
+        x.name = 'y'
+    with raises(AttributeError):
+        Sum(x, y).terms = ()
+
+def test_expressions_have_no_instance_dict():
+    assert not hasattr(Sum(x, y), '__dict__')
+
+def test_simplified_form_is_cached():
+    s = Sum(1, x, 2)
+    assert s.simplify() is s.simplify()
+    assert s.simplify().simplify() is s.simplify()
+
+def test_simplify_flattens_nested_sums():
+    s = Sum(x, Power(Sum(1, y), 1)).simplify()
+    assert s is Sum(1, x, y)
+
+def test_pickle_roundtrip_is_interned():
+    expr = (x + 1)**2 / (y - 3)
+    assert pickle.loads(pickle.dumps(expr)) is expr
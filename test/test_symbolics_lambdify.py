@@ -0,0 +1,78 @@
+from pytest import approx, importorskip, raises
+from wilf.symbolics import Sum, Product, Fraction, Power, Symbol, lambdify, codegen, _functions
+
+x = Symbol('x')
+y = Symbol('y')
+
+def test_lambdify_scalar():
+    f = lambdify(x, Sum(1, Product(2, x)))
+    assert f(3) == 7
+
+def test_lambdify_array():
+    np = importorskip('numpy')
+    f = lambdify(x, x**2 + 1)
+    xs = np.linspace(-1, 1, 101)
+    assert f(xs) == approx(xs**2 + 1)
+
+def test_lambdify_list_argument():
+    importorskip('numpy')
+    f = lambdify(x, Power(x, 3))
+    assert f([1, 2, 3]).tolist() == [1, 8, 27]
+
+def test_lambdify_several_symbols():
+    np = importorskip('numpy')
+    f = lambdify((x, y), Fraction(x, y) + x)
+    assert f(np.array([1.0, 2.0]), np.array([2.0, 4.0])) == approx([1.5, 2.5])
+
+def test_lambdify_constant():
+    assert lambdify(x, 5)(2) == 5
+
+def test_lambdify_constant_keeps_shape():
+    np = importorskip('numpy')
+    assert lambdify(x, 5)(np.zeros(3)).tolist() == [5, 5, 5]
+
+def test_lambdify_matches_subs():
+    expr = (x + 1)**2 / (x - 3) + x * x
+    f = lambdify(x, expr)
+    for v in (0.5, 2, -1):
+        assert f(v) == approx(expr.subs({x: v}))
+
+def test_lambdify_unknown_symbol():
+    with raises(ValueError):
+        lambdify(x, x + y)
+
+def test_lambdify_wrong_argument_count():
+    with raises(TypeError):
+        lambdify(x, x)(1, 2)
+
+def test_codegen_computes_shared_subexpressions_once():
+    source = codegen(x, (x + 1) ** 2 + 3 * (x + 1) ** 3)
+    assert source.count('1 + _a0') == 1
+    assert source.startswith('def f(_a0):')
+
+def test_lambdify_deep_shared_expression():
+    # As a tree this has 2^40 leaves, but only a few distinct nodes
+    e = x
+    for _ in range(40):
+        e = e * e + e * x
+    value = 0.1
+    for _ in range(40):
+        value = value * value + value * 0.1
+    assert lambdify(x, e)(0.1) == approx(value)
+
+def test_lambdify_long_sum():
+    symbols = [Symbol(f'v{i}') for i in range(100)]
+    e = sum((i + 1) * s for i, s in enumerate(symbols))
+    assert lambdify(symbols, e)(*range(100)) == sum((i + 1) * i for i in range(100))
+
+def test_lambdify_constants():
+    f = lambdify(x, 2.5 * x + 1j)
+    assert f(2) == 5 + 1j
+
+def test_compiled_functions_are_cached():
+    expr = x ** 3 + y
+    lambdify((x, y), expr)
+    compiled = _functions[expr][(x, y)]
+    lambdify((x, y), expr)
+    assert _functions[expr][(x, y)] is compiled
+    assert len(_functions[expr]) == 1
@@ -0,0 +1,79 @@
+import fractions
+from wilf import symbolics
+from wilf.symbolics import _sum, SymbolicExpression, Sum, Product, Fraction, Power, Symbol
+
+x = Symbol('x')
+y = Symbol('y')
+z = Symbol('z')
+
+def test_like_terms_are_collected():
+    assert x + x is Product(2, x)
+    assert 2 * x * y + y * x * 3 is Product(5, x, y)
+    assert 1 + x + y - x is Sum(1, y)
+    assert x - x == 0
+
+def test_collected_term_keeps_its_place():
+    assert x + y + 2 * x is Sum(Product(3, x), y)
+
+def test_collected_sums_are_flattened():
+    assert 2 * (x + 1) - (x + 1) is Sum(1, x)
+
+def test_exponents_are_combined():
+    assert x * x * x is Power(x, 3)
+    assert x * y * x ** 2 is Product(Power(x, 3), y)
+    assert x * x ** -1 == 1
+    assert (x ** y) ** 2 is Power(x, Product(2, y))
+    assert (x * y) ** 2 is Product(Power(x, 2), Power(y, 2))
+
+def test_rationals_are_reduced():
+    assert (2 * x) / 4 is Fraction(x, 2)
+    assert (4 * x) / 2 is Product(2, x)
+    assert x / -2 is Fraction(Product(-1, x), 2)
+    assert x / 2.0 is Product(0.5, x)
+
+def test_common_factors_cancel():
+    assert x ** 3 * y / (x * z) is Fraction(Product(Power(x, 2), y), z)
+    assert (x + 1) / (x + 1) == 1
+    assert (2 * x) ** -1 is Fraction(1, Product(2, x))
+
+def test_fractions_are_flattened():
+    assert 3 * (x / 6) is Fraction(x, 2)
+    assert 1 / (x / y) is Fraction(y, x)
+    assert (x / y) / (z / x) is Fraction(Power(x, 2), Product(y, z))
+    assert x / 2 + x / 2 is x
+
+def test_rational_coefficients_have_one_form():
+    assert x / 2 + x is 3 * x / 2 is Fraction(Product(3, x), 2)
+    assert fractions.Fraction(3, 2) * x is 3 * x / 2
+    assert (x / 2 + x) * 2 is 3 * x
+    assert (x / 2 + x) * y / y is 3 * x / 2
+    half = x / 2 + fractions.Fraction(1, 2) + fractions.Fraction(1, 2)
+    assert half is Sum(1, Fraction(x, 2))
+    assert type(half - x / 2) is int
+
+def test_simplify_matches_arithmetic():
+    assert Sum(Product(x, 2), Product(3, x)).simplify() is Product(5, x)
+    assert Product(x, Fraction(y, x)).simplify() is y
+    assert Power(Power(x, 2), 3).simplify() is Power(x, 6)
+
+def test_normal_forms_are_fixed_points():
+    for e in (x + x * y + 2, (x + 1) ** 2 / (y - 3), x ** 3 * y / (x * z), 3 * (x / 6) + y):
+        assert e.simplify() is e
+
+def test_building_a_sum_is_a_bounded_amount_of_work_per_term(monkeypatch):
+    visited = []
+    coefficient = symbolics._coefficient
+    monkeypatch.setattr(symbolics, '_coefficient', lambda t: visited.append(t) or coefficient(t))
+    symbols = [Symbol(f's{i}') for i in range(200)]
+    before = SymbolicExpression.simplify_misses
+    e = 0
+    for i, s in enumerate(symbols):
+        e = e + (i + 1) * s
+    assert SymbolicExpression.simplify_misses - before <= 3 * len(symbols)
+    assert len(visited) <= 2 * len(symbols)
+    assert len(e.terms) == len(symbols)
+    # Like terms and constants added one at a time
+    e = e + 3 - symbols[5] - 6 * symbols[7] + symbols[0] / 2
+    terms = [(i + 1) * s for i, s in enumerate(symbols)]
+    assert e is _sum([3] + terms + [-symbols[5], -6 * symbols[7], symbols[0] / 2])
+    assert e.terms[1] is Fraction(Product(3, symbols[0]), 2) and e.terms[6] is Product(5, symbols[5])
@@ -1,3 +1,4 @@
+from pytest import importorskip, raises
 from wilf.symbolics import Sum, Product, Fraction, Power, Symbol
 
 x = Symbol('x')
@@ -58,3 +59,10 @@ def test_subs_sub():
     # This is the same test, but using the dunder methods
     expr = (x + y)**2 + 1
     assert expr.subs({(x + y): z}) == z**2 + 1
+
+def test_substituting_arrays_points_to_lambdify():
+    np = importorskip('numpy')
+    xs = np.array([1.0, 2.0])
+    assert x.subs({x: xs}) is xs
+    with raises(TypeError, match='lambdify'):
+        (x * x + y).subs({x: xs})
@@ -0,0 +1,148 @@
+"""Bookkeeping for the coefficient buffers held by live power series.
+
+Every PowerSeries registers its buffer here the first time it is filled. The
+registry only holds weak references, so a series that is no longer used is
+freed as usual. Buffer sizes are estimated as the buffer grows. If a budget is
+set, the least recently used buffers are dropped once the total goes over it.
+A dropped buffer is recomputed from the start the next time it is needed.
+"""
+from collections import OrderedDict
+import sys
+import weakref
+
+
+class CoefficientCache:
+    """Global LRU accounting (and optional eviction) of coefficient buffers.
+
+    Attributes:
+        budget: Maximum estimated bytes held across all buffers, or None for
+            no limit.
+        hits: Coefficient lookups answered from a buffer.
+        misses: Coefficient lookups that had to extend a buffer.
+        evictions: Buffers dropped to stay within the budget.
+        pow_hits, pow_misses: Lookups in the per-series memo of powers.
+        profiler: A wilf.profiling.Profile recording per series statistics,
+            or None. Set by wilf.profiling.profile().
+    """
+    def __init__(self, budget : 'int | None' = None):
+        self.budget = budget
+        self.profiler = None
+        self._entries = OrderedDict()   # id(series) -> (weakref, estimated bytes)
+        self._bytes = 0
+        self._depth = 0
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.pow_hits = 0
+        self.pow_misses = 0
+
+    @property
+    def bytes(self) -> int:
+        """Estimated bytes held by all live coefficient buffers"""
+        return self._bytes
+
+    def __len__(self) -> int:
+        """The number of live series with a non-empty buffer"""
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        return {
+            'series': len(self),
+            'bytes': self.bytes,
+            'budget': self.budget,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'pow_hits': self.pow_hits,
+            'pow_misses': self.pow_misses,
+        }
+
+    def fill(self, series, n : int):
+        """Extend the buffer of series to n coefficients, then account for it.
+
+        The series it depends on are extended first, in dependency order (see
+        PowerSeries._schedule), so that no extension has to recurse into
+        another.
+        """
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.miss(series, root=self._depth == 0)
+        self._depth += 1
+        try:
+            for s, m in series._schedule(n):
+                if len(s._coeffs) < m:
+                    if profiler is None:
+                        s._extend(m)
+                    else:
+                        profiler.extend(s, m)
+                    self._update(s)
+        finally:
+            self._depth -= 1
+        self._update(series)
+
+    def hit(self, series):
+        """Count a lookup answered from the buffer of series"""
+        self.hits += 1
+        self.touch(series)
+        if self.profiler is not None:
+            self.profiler.hit(series)
+
+    def touch(self, series):
+        """Mark series as recently used"""
+        key = id(series)
+        if key in self._entries:
+            self._entries.move_to_end(key)
+
+    def _update(self, series):
+        key = id(series)
+        size = _estimate_bytes(series._coeffs)
+        entry = self._entries.get(key)
+        if entry is None:
+            ref = weakref.ref(series, lambda _, key=key: self._forget(key))
+        else:
+            ref, old_size = entry
+            self._bytes -= old_size
+        self._entries[key] = (ref, size)
+        self._entries.move_to_end(key)
+        self._bytes += size
+        # Buffers can only be dropped safely when no extension is in progress,
+        # as the kernels hold on to their operands' buffers while they work.
+        if self._depth == 0 and self.budget is not None:
+            self._evict(keep=key)
+
+    def _forget(self, key : int):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def _evict(self, keep : int):
+        for key in list(self._entries):
+            if self._bytes <= self.budget:
+                break
+            if key == keep:
+                continue
+            ref, size = self._entries.pop(key)
+            self._bytes -= size
+            series = ref()
+            if series is not None:
+                series._coeffs = []
+                self.evictions += 1
+
+    def clear(self):
+        """Drop every buffer"""
+        for ref, _ in self._entries.values():
+            series = ref()
+            if series is not None:
+                series._coeffs = []
+        self._entries.clear()
+        self._bytes = 0
+
+
+def _estimate_bytes(coeffs : list) -> int:
+    """Estimated size of a buffer, taking the last coefficient as typical"""
+    if not coeffs:
+        return 0
+    return sys.getsizeof(coeffs) + len(coeffs) * sys.getsizeof(coeffs[-1])
@@ -0,0 +1,186 @@
+"""Convolution kernels used to multiply materialised coefficient prefixes.
+
+These operate on plain lists of coefficients. They are only used when every
+coefficient is a number; symbolic coefficients always go through the online
+(schoolbook) product in PowerSeries.
+
+Long float and complex products go through the FFT. Its rounding error is
+spread evenly over all coefficients, at roughly
+
+    eps * log2(N) * |a|_2 * |b|_2
+
+for a transform of length N, whereas the direct product gets each coefficient
+c_k right to about eps * sum_j |a_j b_{k-j}|. Series whose coefficients span
+many orders of magnitude (e.g. exp(x), with coefficients 1/k!) would lose their
+small coefficients entirely, so fft_convolve also estimates the error of every
+coefficient relative to the accuracy of the direct product, and convolve falls
+back to the direct product whenever that estimate exceeds FFT_TOLERANCE.
+"""
+from numbers import Integral, Number, Rational
+import math
+
+from wilf import ntt
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Below this length Karatsuba recurses into the schoolbook product.
+KARATSUBA_CUTOFF = 32
+# From this length integer products go through the NTT, when numpy is available.
+NTT_CUTOFF = 64
+# From this length float and complex products go through the FFT, when numpy
+# is available and the estimated error is acceptable.
+FFT_CUTOFF = 256
+# The largest estimated relative error accepted from the FFT (see fft_convolve)
+FFT_TOLERANCE = 1e-9
+
+
+def schoolbook(a : list, b : list, n : int) -> list:
+    """The first n coefficients of the product of a and b, computed directly"""
+    return [
+        sum(a[j] * b[k - j] for j in range(max(0, k - len(b) + 1), min(k + 1, len(a))))
+        for k in range(n)
+    ]
+
+
+def karatsuba(a : list, b : list) -> list:
+    """The full product of two equal length coefficient lists"""
+    n = len(a)
+    if n < KARATSUBA_CUTOFF:
+        return schoolbook(a, b, 2 * n - 1)
+    m = n // 2
+    a0, a1 = a[:m], a[m:]
+    b0, b1 = b[:m], b[m:]
+    z0 = karatsuba(a0, b0)
+    z2 = karatsuba(a1, b1)
+    z1 = karatsuba(_add(a1, a0), _add(b1, b0))
+
+    out = [0] * (2 * n - 1)
+    for i, c in enumerate(z0):
+        out[i] += c
+        out[i + m] -= c
+    for i, c in enumerate(z2):
+        out[i + 2 * m] += c
+        out[i + m] -= c
+    for i, c in enumerate(z1):
+        out[i + m] += c
+    return out
+
+
+def _add(long : list, short : list) -> list:
+    """Elementwise sum of two lists, where short is no longer than long"""
+    return [c + short[i] if i < len(short) else c for i, c in enumerate(long)]
+
+
+def _as_array(a : list):
+    """Convert a to a numeric numpy array, or None if numpy can't hold it exactly"""
+    try:
+        arr = np.asarray(a)
+    except (OverflowError, TypeError, ValueError):
+        return None
+    return arr if arr.dtype.kind in 'biufc' else None
+
+
+def convolve(a : list, b : list, n : int) -> list:
+    """The first n coefficients of the product of a and b.
+
+    Both lists must hold at least n coefficients. Picks a kernel based on the
+    coefficient domain: numpy for floats and complex numbers (when numpy is
+    available, by FFT for long products whose rounding error is acceptable),
+    the NTT (or Karatsuba) for integers, Karatsuba for exact
+    rationals, and the schoolbook product otherwise.
+    """
+    a = a[:n]
+    b = b[:n]
+    both = a + b
+    if not all(isinstance(c, Number) for c in both):
+        return schoolbook(a, b, n)
+    if np is not None and any(isinstance(c, (float, complex)) for c in both):
+        fa, fb = _as_array(a), _as_array(b)
+        if fa is not None and fb is not None:
+            if n >= FFT_CUTOFF:
+                values, errors = fft_convolve(fa, fb, n)
+                if max(errors) <= FFT_TOLERANCE:
+                    return values
+            return np.convolve(fa, fb)[:n].tolist()
+    if all(isinstance(c, Integral) for c in both):
+        return integer_convolve(a, b, n)
+    if all(isinstance(c, Rational) for c in both):
+        return karatsuba(a, b)[:n]
+    return schoolbook(a, b, n)
+
+
+def integer_convolve(a : list, b : list, n : int) -> list:
+    """The first n coefficients of the product of two lists of ints"""
+    if n >= NTT_CUTOFF and ntt.available():
+        out = ntt.convolve_integers(a, b, n)
+        if out is not None:
+            return out
+    return karatsuba(a[:n], b[:n])[:n]
+
+
+def modular_convolve(a : list, b : list, n : int, p : int) -> list:
+    """The first n coefficients of the product of two lists of ints mod p"""
+    if n >= NTT_CUTOFF and ntt.available():
+        out = ntt.convolve_mod(a, b, n, p)
+        if out is not None:
+            return out
+    return [c % p for c in karatsuba(a[:n], b[:n])[:n]]
+
+
+def fft_convolve(a : list, b : list, n : int) -> tuple:
+    """The first n coefficients of a*b by FFT, with estimated relative errors.
+
+    a and b hold floats or complex numbers; numpy is required. Returns the
+    coefficients and, for each one, an estimate of its absolute error divided
+    by sum_j |a_j b_{k-j}|. That denominator is the scale of the rounding
+    error of the direct product, so an estimate around 1e-16 means the FFT is
+    as good as the direct product, and an estimate of 1 or more means the
+    coefficient may be pure noise. Coefficients with no non-zero terms in
+    their sum are exactly zero, with no error.
+    """
+    a = np.asarray(a[:n])
+    b = np.asarray(b[:n])
+    values = np.zeros(n, dtype=np.result_type(a, b, float))
+    errors = np.zeros(n)
+    # Leading zeros only shift the product, so transform without them
+    va, vb = _valuation(a), _valuation(b)
+    if va + vb >= n:
+        return values.tolist(), errors.tolist()
+    m = n - va - vb
+    a = a[va:va + m]
+    b = b[vb:vb + m]
+    # Work with the operands scaled to at most 1, so that their norms can't
+    # overflow; the relative errors don't depend on the scale.
+    sa, sb = np.max(np.abs(a)), np.max(np.abs(b))
+    a = a / sa
+    b = b / sb
+    size = 1 << max(0, (2 * m - 2).bit_length())
+    if a.dtype.kind == 'c' or b.dtype.kind == 'c':
+        product = np.fft.ifft(np.fft.fft(a, size) * np.fft.fft(b, size))[:m]
+    else:
+        product = _real_convolve(a, b, m, size)
+    # The scale sum_j |a_j b_{k-j}| comes from the FFT too, so it is only
+    # known to within the same absolute error; where it is that small the
+    # estimate comes out around 1 or more, which is the right answer. Where
+    # no term of the sum is non-zero, the coefficient is exactly zero.
+    error = np.finfo(float).eps * (math.log2(size) + 1) * np.linalg.norm(a) * np.linalg.norm(b)
+    scale = _real_convolve(np.abs(a), np.abs(b), m, size)
+    support = _real_convolve((a != 0).astype(float), (b != 0).astype(float), m, size) > 0.5
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        estimate = np.where(scale > 0, error / scale, np.inf)
+        values[va + vb:] = np.where(support, product * sa * sb, 0)
+    errors[va + vb:] = np.where(support, estimate, 0.0)
+    return values.tolist(), errors.tolist()
+
+
+def _valuation(a) -> int:
+    """The index of the first non-zero entry of an array, or its length if there is none"""
+    nonzero = np.flatnonzero(a)
+    return int(nonzero[0]) if len(nonzero) else len(a)
+
+
+def _real_convolve(a, b, n : int, size : int):
+    return np.fft.irfft(np.fft.rfft(a, size) * np.fft.rfft(b, size), size)[:n]
@@ -0,0 +1,272 @@
+"""Sparse multivariate polynomials with exact rational coefficients.
+
+This is an alternative to wilf.symbolics for polynomial coefficients. Like
+terms are always collected, so a coefficient such as the n-th Legendre
+polynomial has at most n + 1 terms, however it was computed. Polynomials mix
+freely with numbers and with PowerSeries:
+
+    >>> t = MultivariatePolynomial.symbol('t')
+    >>> legendre = 1/((1 - 2 * x * t + x**2)**0.5)
+    >>> legendre.f(2)
+    3/2*t^2 - 1/2
+
+Arithmetic results that are constant come back as plain numbers. This keeps
+checks like `c == 0` and `c == 1` cheap and exact.
+"""
+from fractions import Fraction
+from numbers import Integral, Number, Rational
+from typing import Dict, Tuple
+
+from wilf.symbolics import Expression, SymbolicExpression, Symbol, Sum, Product, Power
+from wilf import symbolics
+
+
+class MultivariatePolynomial:
+    """A polynomial stored as a dict from exponent tuples to coefficients.
+
+    Attributes:
+        symbols: The variables, sorted by name. Exponent tuples are indexed in
+            the same order.
+        terms: Maps exponent tuples to non-zero coefficients.
+    """
+    __slots__ = ('symbols', 'terms', '_hash')
+
+    def __init__(self, terms : Dict[Tuple[int, ...], Number], symbols : Tuple[Symbol, ...]):
+        self.symbols = tuple(symbols)
+        self.terms = {e: c for e, c in terms.items() if c != 0}
+        self._hash = None
+
+    @classmethod
+    def symbol(cls, symbol : 'Symbol | str') -> 'MultivariatePolynomial':
+        """The polynomial consisting of a single variable"""
+        if isinstance(symbol, str):
+            symbol = Symbol(symbol)
+        return cls({(1,): 1}, (symbol,))
+
+    @classmethod
+    def from_expression(cls, expr : Expression) -> 'MultivariatePolynomial | Number':
+        """Convert a symbolic expression, which must be a polynomial, into this form"""
+        match expr:
+            case Number():
+                return _exact(expr)
+            case Symbol():
+                return cls.symbol(expr)
+            case Sum():
+                return sum((cls.from_expression(t) for t in expr.terms), 0)
+            case Product():
+                out = 1
+                for t in expr.terms:
+                    out = out * cls.from_expression(t)
+                return out
+            case Power(base, exponent) if isinstance(exponent, Integral) and exponent >= 0:
+                return cls.from_expression(base) ** exponent
+            case symbolics.Fraction(numerator, denominator) if isinstance(denominator, Number):
+                return cls.from_expression(numerator) / denominator
+            case _:
+                raise ValueError(f"{expr} is not a polynomial")
+
+    def to_expression(self) -> Expression:
+        """Convert to a wilf.symbolics expression"""
+        terms = []
+        for exponents, c in sorted(self.terms.items(), reverse=True):
+            factors = [s if e == 1 else Power(s, e) for s, e in zip(self.symbols, exponents) if e]
+            terms.append(Product(c, *factors))
+        return Sum(*terms).simplify()
+
+    @property
+    def degree(self) -> int:
+        """Total degree"""
+        return max(sum(e) for e in self.terms)
+
+    def __repr__(self):
+        out = []
+        for exponents, c in sorted(self.terms.items(), reverse=True):
+            monomial = '*'.join(
+                s.name if e == 1 else f'{s.name}^{e}'
+                for s, e in zip(self.symbols, exponents) if e
+            )
+            if not monomial:
+                out.append(str(c))
+            elif c == 1:
+                out.append(monomial)
+            elif c == -1:
+                out.append(f'-{monomial}')
+            else:
+                out.append(f'{c}*{monomial}')
+        return ' + '.join(out).replace(' + -', ' - ')
+
+    def __eq__(self, other):
+        if not isinstance(other, MultivariatePolynomial):
+            return NotImplemented if not isinstance(other, Number) else False
+        symbols, a, b = _align(self, other)
+        return a == b
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(frozenset(
+                (tuple((s, e) for s, e in zip(self.symbols, exponents) if e), c)
+                for exponents, c in self.terms.items()
+            ))
+        return self._hash
+
+    def __neg__(self):
+        return MultivariatePolynomial({e: -c for e, c in self.terms.items()}, self.symbols)
+
+    def __add__(self, other):
+        match other:
+            case MultivariatePolynomial():
+                symbols, a, b = _align(self, other)
+                out = dict(a)
+                for e, c in b.items():
+                    out[e] = out.get(e, 0) + c
+                return _normalize(out, symbols)
+            case Number():
+                out = dict(self.terms)
+                zero = (0,) * len(self.symbols)
+                out[zero] = out.get(zero, 0) + _exact(other)
+                return _normalize(out, self.symbols)
+            case _:
+                return NotImplemented
+
+    def __radd__(self, other):
+        return self + other
+
+    def __sub__(self, other):
+        if not isinstance(other, (MultivariatePolynomial, Number)):
+            return NotImplemented
+        return self + (-other)
+
+    def __rsub__(self, other):
+        return -self + other
+
+    def __mul__(self, other):
+        match other:
+            case MultivariatePolynomial():
+                symbols, a, b = _align(self, other)
+                out = {}
+                for ea, ca in a.items():
+                    for eb, cb in b.items():
+                        e = tuple(i + j for i, j in zip(ea, eb))
+                        out[e] = out.get(e, 0) + ca * cb
+                return _normalize(out, symbols)
+            case Number():
+                if other == 0:
+                    return 0
+                other = _exact(other)
+                return _normalize({e: c * other for e, c in self.terms.items()}, self.symbols)
+            case _:
+                return NotImplemented
+
+    def __rmul__(self, other):
+        return self * other
+
+    def __truediv__(self, other):
+        if not isinstance(other, Number):
+            return NotImplemented
+        other = _exact(other)
+        return _normalize({e: _divide(c, other) for e, c in self.terms.items()}, self.symbols)
+
+    def __pow__(self, n):
+        if not isinstance(n, Integral) or n < 0:
+            return NotImplemented
+        out, base = 1, self
+        while n:
+            if n & 1:
+                out = out * base
+            base = base * base
+            n >>= 1
+        return out
+
+    def subs(self, subs : 'Dict[Symbol, Expression]', simplify : bool = True) -> 'MultivariatePolynomial | Expression':
+        """Substitute values for symbols.
+
+        When every variable is given a number (or a numpy array), the result is
+        evaluated by Horner's scheme. Otherwise the values are converted to
+        polynomials and substituted into each term, so they can't be arrays.
+        """
+        values = [subs.get(s, s) for s in self.symbols]
+        if not any(isinstance(v, (Symbol, SymbolicExpression, MultivariatePolynomial)) for v in values):
+            return _horner(self.terms, values)
+        out = 0
+        for exponents, c in self.terms.items():
+            term = c
+            for v, e in zip(values, exponents):
+                if e:
+                    term = term * _as_polynomial(v) ** e
+            out = out + term
+        return out
+
+
+def _exact(c : Number) -> Number:
+    """Floats are converted to the rationals they represent exactly"""
+    if isinstance(c, float) and c.is_integer():
+        return int(c)
+    if isinstance(c, float):
+        return Fraction(c)
+    return c
+
+
+def _divide(c : Number, d : Number) -> Number:
+    if isinstance(c, Rational) and isinstance(d, Rational):
+        q = Fraction(c, d)
+        return q.numerator if q.denominator == 1 else q
+    return c / d
+
+
+def _as_polynomial(v):
+    match v:
+        case MultivariatePolynomial() | Number():
+            return v
+        case SymbolicExpression():
+            return MultivariatePolynomial.from_expression(v)
+    raise TypeError(f"Can't substitute a {type(v).__name__} alongside symbolic values. "
+                    "To evaluate at numpy arrays, give every variable a value, or use lambdify.")
+
+
+def _normalize(terms : dict, symbols : tuple) -> 'MultivariatePolynomial | Number':
+    """Drop zero terms and unused symbols, and return constants as numbers"""
+    terms = {e: c for e, c in terms.items() if c != 0}
+    used = [i for i in range(len(symbols)) if any(e[i] for e in terms)]
+    if not used:
+        return terms.get((0,) * len(symbols), 0)
+    if len(used) < len(symbols):
+        terms = {tuple(e[i] for i in used): c for e, c in terms.items()}
+        symbols = tuple(symbols[i] for i in used)
+    return MultivariatePolynomial(terms, symbols)
+
+
+def _align(a : MultivariatePolynomial, b : MultivariatePolynomial) -> tuple:
+    """Re-key the terms of a and b over the union of their symbols"""
+    if a.symbols == b.symbols:
+        return a.symbols, a.terms, b.terms
+    symbols = tuple(sorted(set(a.symbols) | set(b.symbols), key=lambda s: s.name))
+    return symbols, _rekey(a, symbols), _rekey(b, symbols)
+
+
+def _rekey(p : MultivariatePolynomial, symbols : tuple) -> dict:
+    position = {s: i for i, s in enumerate(p.symbols)}
+    index = [position.get(s) for s in symbols]
+    return {
+        tuple(0 if i is None else e[i] for i in index): c
+        for e, c in p.terms.items()
+    }
+
+
+def _horner(terms : dict, values : list):
+    """Evaluate a polynomial, given as a dict of exponent tuples, at the given values"""
+    if not values:
+        return terms.get((), 0)
+    # Group terms by the exponent of the first variable, then evaluate the
+    # resulting univariate polynomial in that variable by Horner's scheme.
+    groups = {}
+    for e, c in terms.items():
+        groups.setdefault(e[0], {})[e[1:]] = c
+    v, rest = values[0], values[1:]
+    out = 0
+    previous = None
+    for e in sorted(groups, reverse=True):
+        if previous is not None:
+            out = out * v ** (previous - e)
+        out = out + _horner(groups[e], rest)
+        previous = e
+    return out * v ** previous if previous else out
@@ -0,0 +1,65 @@
+"""Newton iterations on materialised coefficient prefixes.
+
+Each function here extends a known prefix of some series derived from a, doubling
+the number of correct coefficients per step, so the total cost is a constant
+multiple of one convolution of the final length. Arithmetic is done in the
+given coefficient ring.
+"""
+from wilf.rings import Ring, SR
+
+
+def reciprocal(a : list, b : list, n : int, ring : Ring = SR) -> list:
+    """Extend b, a non-empty prefix of 1/a, to the first n coefficients of 1/a.
+
+    a must hold at least n coefficients.
+    """
+    b = list(b)
+    while len(b) < n:
+        k = len(b)
+        k2 = min(2 * k, n)
+        b_pad = b + [0] * (k2 - k)
+        # a*b is 1 + O(x^k); the correction is -b * (a*b - 1)
+        ab = ring.convolve(a, b_pad, k2)
+        err = [0] * k + ab[k:]
+        b += [ring.coerce(-c) for c in ring.convolve(b_pad, err, k2)[k:]]
+    return b
+
+
+def log(a : list, n : int, ring : Ring = SR) -> list:
+    """The first n coefficients of log(a), less its constant term log(a_0).
+
+    Computed as the integral of a'/a. a must hold at least n coefficients.
+    """
+    if n <= 1:
+        return [0] * n
+    da = [ring.coerce((i + 1) * a[i + 1]) for i in range(n - 1)]
+    quotient = ring.convolve(da, reciprocal(a, [ring.inverse(a[0])], n - 1, ring), n - 1)
+    return [0] + [ring.divide(c, i + 1) for i, c in enumerate(quotient)]
+
+
+def exp(a : list, g : list, n : int, ring : Ring = SR) -> list:
+    """Extend g, a non-empty prefix of exp(a), to the first n coefficients of exp(a).
+
+    a must hold at least n coefficients.
+    """
+    g = list(g)
+    while len(g) < n:
+        k = len(g)
+        k2 = min(2 * k, n)
+        g_pad = g + [0] * (k2 - k)
+        # log(g) agrees with a up to x^k; the correction is g * (a - log(g))
+        lg = log(g_pad, k2, ring)
+        err = [0] * k + [ring.coerce(a[i] - lg[i]) for i in range(k, k2)]
+        g += ring.convolve(g_pad, err, k2)[k:]
+    return g
+
+
+def power(a : list, b : list, alpha, n : int, ring : Ring = SR) -> list:
+    """Extend b, a non-empty prefix of a**alpha, to the first n coefficients of a**alpha.
+
+    Computed as b_0 exp(alpha log(a / a_0)). a must hold at least n coefficients.
+    """
+    b0 = b[0]
+    l = [ring.coerce(alpha * c) for c in log(a, n, ring)]
+    g = exp(l, [ring.divide(c, b0) for c in b], n, ring)
+    return list(b) + [ring.coerce(b0 * c) for c in g[len(b):]]
@@ -0,0 +1,165 @@
+"""Number-theoretic transform (NTT) convolution of integer coefficient lists.
+
+The transforms are vectorised with numpy over int64, modulo primes of the form
+c * 2^k + 1 below 2^30, so that products of two residues fit in an int64.
+Products modulo a prime that isn't NTT friendly, and products of arbitrary
+integers, are computed modulo enough of these primes to pin the result down,
+then recombined with the Chinese remainder theorem.
+
+numpy is optional; available() reports whether these kernels can be used.
+"""
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# (prime, k, primitive root) for primes c * 2^k + 1 < 2^30
+PRIMES = (
+    (998244353, 23, 3),
+    (985661441, 22, 3),
+    (943718401, 22, 7),
+    (935329793, 22, 3),
+    (918552577, 22, 5),
+    (897581057, 23, 3),
+    (880803841, 23, 26),
+    (754974721, 24, 11),
+    (683671553, 22, 3),
+    (666894337, 22, 5),
+    (645922817, 23, 3),
+    (595591169, 23, 3),
+)
+_ROOTS = {p: (k, g) for p, k, g in PRIMES}
+
+# The longest transform every prime supports
+MAX_LENGTH = 2 ** min(k for _, k, _ in PRIMES)
+
+
+def available() -> bool:
+    return np is not None
+
+
+def _transform(a, p : int, g : int, invert : bool = False):
+    """Iterative radix-2 NTT of a length 2^m int64 array"""
+    n = len(a)
+    a = a[_bit_reversal(n)]
+    length = 2
+    while length <= n:
+        half = length // 2
+        w = pow(g, (p - 1) // length, p)
+        if invert:
+            w = pow(w, p - 2, p)
+        twiddles = _powers(w, half, p)
+        a = a.reshape(-1, length)
+        u = a[:, :half]
+        v = a[:, half:] * twiddles % p
+        a = np.concatenate(((u + v) % p, (u - v) % p), axis=1).reshape(-1)
+        length *= 2
+    if invert:
+        a = a * pow(n, p - 2, p) % p
+    return a
+
+
+def _powers(w : int, n : int, p : int):
+    """The array [1, w, w^2, ..., w^(n-1)] mod p"""
+    out = np.ones(1, dtype=np.int64)
+    step = w
+    while len(out) < n:
+        out = np.concatenate((out, out * step % p))
+        step = step * step % p
+    return out[:n]
+
+
+_bit_reversals = {}
+
+def _bit_reversal(n : int):
+    if n not in _bit_reversals:
+        bits = n.bit_length() - 1
+        idx = np.arange(n)
+        rev = np.zeros(n, dtype=np.int64)
+        for i in range(bits):
+            rev |= ((idx >> i) & 1) << (bits - 1 - i)
+        _bit_reversals[n] = rev
+    return _bit_reversals[n]
+
+
+def _convolve_prime(a : list, b : list, n : int, p : int):
+    """The first n coefficients of a*b mod an NTT prime p, as an int64 array"""
+    k, g = _ROOTS[p]
+    size = 1 << max(0, (2 * n - 2).bit_length())
+    fa = np.zeros(size, dtype=np.int64)
+    fb = np.zeros(size, dtype=np.int64)
+    fa[:n] = [c % p for c in a[:n]]
+    fb[:n] = [c % p for c in b[:n]]
+    fc = _transform(fa, p, g) * _transform(fb, p, g) % p
+    return _transform(fc, p, g, invert=True)[:n]
+
+
+def _crt(residues : list, primes : list) -> list:
+    """Recombine per-prime residue arrays into integers in [0, prod(primes))"""
+    # Garner's algorithm: mixed radix digits are computed vectorised, then
+    # assembled into Python ints.
+    digits = []
+    for i, p in enumerate(primes):
+        x = residues[i].copy()
+        for j, d in enumerate(digits):
+            x = (x - d) * pow(primes[j], -1, p) % p
+        digits.append(x)
+    out = [0] * len(residues[0])
+    scale = 1
+    columns = []
+    for d, p in zip(digits, primes):
+        columns.append((d.tolist(), scale))
+        scale *= p
+    for values, s in columns:
+        out = [o + v * s for o, v in zip(out, values)]
+    return out
+
+
+def convolve_mod(a : list, b : list, n : int, p : int) -> 'list | None':
+    """The first n coefficients of a*b mod p, for lists of ints in range(p).
+
+    Returns None if the product is too long for the available primes.
+    """
+    if 2 * n - 1 > MAX_LENGTH:
+        return None
+    if p in _ROOTS and (2 * n - 2).bit_length() <= _ROOTS[p][0]:
+        return _convolve_prime(a, b, n, p).tolist()
+    out = _convolve_bounded(a, b, n, n * (p - 1) ** 2)
+    return None if out is None else [c % p for c in out[0]]
+
+
+def convolve_integers(a : list, b : list, n : int) -> 'list | None':
+    """The first n coefficients of a*b for lists of arbitrary ints.
+
+    Returns None if the coefficients are too large or the product too long.
+    """
+    if 2 * n - 1 > MAX_LENGTH:
+        return None
+    bound = n * max(map(abs, a[:n]), default=0) * max(map(abs, b[:n]), default=0)
+    # Results lie in [-bound, bound], so residues modulo anything above
+    # 2 * bound identify them, reading the top half as negative.
+    out = _convolve_bounded(a, b, n, 2 * bound)
+    if out is None:
+        return None
+    values, modulus = out
+    half = modulus // 2
+    return [c - modulus if c > half else c for c in values]
+
+
+def _convolve_bounded(a : list, b : list, n : int, bound : int) -> 'tuple | None':
+    """The first n coefficients of a*b modulo a product of NTT primes above bound.
+
+    Returns the coefficients, reduced into [0, modulus), and the modulus; or
+    None if all the primes together don't exceed bound.
+    """
+    primes = []
+    modulus = 1
+    for p, _, _ in PRIMES:
+        primes.append(p)
+        modulus *= p
+        if modulus > bound:
+            break
+    if modulus <= bound:
+        return None
+    residues = [_convolve_prime(a, b, n, p) for p in primes]
+    return _crt(residues, primes), modulus
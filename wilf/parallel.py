@@ -0,0 +1,82 @@
+"""Computing the coefficients of many series in parallel processes.
+
+Series are sent to worker processes by pickling their definitions (see
+PowerSeries.__reduce__): derived series pickle as their graph of operations,
+and the leaves need coefficient functions that can be pickled, i.e. ones
+defined at module level rather than lambdas. Buffers are not sent, so each
+worker computes what it needs from scratch.
+
+    >>> from wilf import parallel
+    >>> parallel.coefficients([catalan, motzkin, schroeder], 10000, workers=3)
+
+Numeric results can be returned through shared memory instead of being
+pickled back, by asking for a numpy dtype.
+"""
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Sequence
+
+from wilf.powerseries import PowerSeries
+
+try:
+    import numpy as np
+    from multiprocessing import shared_memory
+except ImportError:
+    np = None
+
+
+def coefficients(series : Sequence[PowerSeries], n : int, workers : int = None,
+                 dtype : 'np.dtype' = None, executor : Executor = None) -> 'list | np.ndarray':
+    """The first n coefficients of each of several series, computed in parallel.
+
+    Args:
+        series: The series to evaluate, each in its own task.
+        n: How many coefficients to compute for each.
+        workers: The number of processes, by default one per CPU. Ignored if
+            an executor is given.
+        dtype: If given, a numpy dtype that can hold the coefficients (e.g.
+            float, complex or np.int64). The workers then write their results
+            into one shared memory block, which is returned as an array of
+            shape (len(series), n), rather than pickling lists back.
+        executor: An executor to submit the tasks to, e.g. a long lived
+            ProcessPoolExecutor. By default a new pool is started and shut
+            down again.
+
+    Returns:
+        A list with a list of coefficients for each series, or an array if
+        dtype was given.
+    """
+    if executor is None:
+        with ProcessPoolExecutor(workers) as executor:
+            return coefficients(series, n, dtype=dtype, executor=executor)
+    if dtype is None:
+        return list(executor.map(_coefficients, series, [n] * len(series)))
+    if np is None:
+        raise ImportError("Returning coefficients through shared memory requires numpy")
+    shape = (len(series), n)
+    dtype = np.dtype(dtype)
+    block = shared_memory.SharedMemory(create=True, size=max(1, dtype.itemsize * len(series) * n))
+    try:
+        futures = [
+            executor.submit(_write_coefficients, s, n, block.name, shape, dtype.str, row)
+            for row, s in enumerate(series)
+        ]
+        for future in futures:
+            future.result()
+        return np.ndarray(shape, dtype=dtype, buffer=block.buf).copy()
+    finally:
+        block.close()
+        block.unlink()
+
+
+def _coefficients(series : PowerSeries, n : int) -> list:
+    return series.coefficients(n)
+
+
+def _write_coefficients(series : PowerSeries, n : int, name : str, shape : tuple, dtype : str, row : int):
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        out = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+        out[row] = series.coefficients(n)
+        del out
+    finally:
+        block.close()
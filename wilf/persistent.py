@@ -0,0 +1,220 @@
+"""Coefficient prefixes stored on disk, shared between processes and runs.
+
+A DiskCache keeps the coefficients of series in a directory, keyed by a hash
+of their definition (as pickled by PowerSeries.__reduce__), which includes
+the coefficient ring:
+
+    >>> store = DiskCache('~/.cache/wilf')
+    >>> store.coefficients(catalan, 10 ** 6)   # computed, then stored
+    >>> store.coefficients(catalan, 10 ** 6)   # read back from disk
+
+Leaf series pickle their coefficient functions by module and name, so if the
+code of one changes, the old coefficients are still found under the same key.
+Call clear() after changing such a function.
+
+Numeric prefixes (floats, complex numbers, and ints that fit in 64 bits) are
+stored in a small binary format: a fixed size header followed by the raw
+array, which is extended in place and read back through a memory map. Other
+coefficients (large ints, fractions, symbolic expressions) are pickled.
+"""
+import hashlib
+import os
+import pickle
+import struct
+import tempfile
+from contextlib import contextmanager
+from numbers import Integral
+from pathlib import Path
+
+from wilf.powerseries import PowerSeries, DerivedSeries
+from wilf.utils import postorder
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+MAGIC = b'WILFCOEF'
+VERSION = 1
+# magic, version, numpy dtype string, number of coefficients
+HEADER = struct.Struct('<8sB15sQ')
+
+
+class DiskCache:
+    """Coefficient prefixes of series, stored in a directory.
+
+    Attributes:
+        directory: Where the prefixes are kept. Created if it doesn't exist.
+    """
+    def __init__(self, directory : 'str | os.PathLike'):
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def key(self, series : PowerSeries) -> str:
+        """The name a series is stored under.
+
+        This is a hash of the series' graph, built up from hashes of its
+        operands, so identical definitions get the same key even when they
+        are separate objects.
+        """
+        digests = {}
+        children = lambda s: [arg for arg in _definition(s)[1] if isinstance(arg, PowerSeries)]
+        for s in postorder(series, children):
+            function, args = _definition(s)
+            args = tuple(('series', digests[id(arg)]) if isinstance(arg, PowerSeries) else arg for arg in args)
+            digests[id(s)] = hashlib.sha256(pickle.dumps((VERSION, function, args), protocol=4)).hexdigest()
+        return digests[id(series)]
+
+    def stored(self, series : PowerSeries) -> 'np.ndarray | list':
+        """The stored prefix of series.
+
+        Numeric prefixes come back as read-only memory mapped arrays, and
+        others as lists. If nothing is stored, this is an empty list.
+        """
+        return self._read(self.key(series))
+
+    def load(self, series : PowerSeries) -> int:
+        """Fill the buffer of series from disk, if more is stored than it holds.
+
+        Returns the number of coefficients stored.
+        """
+        stored = self.stored(series)
+        if len(stored) > len(series._coeffs):
+            series._coeffs = stored.tolist() if np is not None and isinstance(stored, np.ndarray) else list(stored)
+            series.cache._update(series)
+        return len(stored)
+
+    def save(self, series : PowerSeries):
+        """Store the buffer of series, appending to what is already stored"""
+        key = self.key(series)
+        coeffs = list(series._coeffs)
+        with self._lock(key):
+            stored = self._length(key)
+            if len(coeffs) <= stored:
+                return
+            dtype = _dtype(coeffs)
+            path = self._path(key, dtype is not None)
+            if dtype is not None and stored and _read_header(path)[0] == dtype:
+                _append(path, dtype, coeffs[stored:], stored)
+            elif dtype is not None:
+                _replace(path, lambda f: _write_array(f, dtype, coeffs))
+                self._path(key, False).unlink(missing_ok=True)
+            else:
+                _replace(path, lambda f: pickle.dump(coeffs, f, protocol=4))
+                self._path(key, True).unlink(missing_ok=True)
+
+    def coefficients(self, series : PowerSeries, n : int) -> 'np.ndarray | list':
+        """The first n coefficients of series, read from disk where possible.
+
+        Any coefficients that have to be computed are stored afterwards, and
+        computing them carries on from the stored prefix.
+        """
+        stored = self.stored(series)
+        if len(stored) >= n:
+            return stored[:n]
+        self.load(series)
+        series.coefficients(n)
+        self.save(series)
+        return self.stored(series)[:n]
+
+    def clear(self):
+        """Delete every stored prefix"""
+        for path in self.directory.iterdir():
+            if path.suffix in ('.coef', '.pickle', '.lock'):
+                path.unlink(missing_ok=True)
+
+    def _path(self, key : str, numeric : bool) -> Path:
+        return self.directory / (key + ('.coef' if numeric else '.pickle'))
+
+    def _length(self, key : str) -> int:
+        path = self._path(key, True)
+        if path.exists():
+            return _read_header(path)[1]
+        return len(self._read(key))
+
+    def _read(self, key : str) -> 'np.ndarray | list':
+        path = self._path(key, True)
+        if np is not None and path.exists():
+            dtype, count = _read_header(path)
+            if count == 0:
+                return np.empty(0, dtype=dtype)
+            return np.memmap(path, dtype=dtype, mode='r', offset=HEADER.size, shape=(count,))
+        path = self._path(key, False)
+        if path.exists():
+            with open(path, 'rb') as f:
+                return pickle.load(f)
+        return []
+
+    @contextmanager
+    def _lock(self, key : str):
+        """Hold an exclusive lock on key, between processes where possible"""
+        if fcntl is None:
+            yield
+            return
+        with open(self.directory / (key + '.lock'), 'w') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _definition(series : PowerSeries) -> tuple:
+    """The function and arguments that rebuild a single node"""
+    if isinstance(series, DerivedSeries):
+        return series._recipe()
+    return series.__reduce__()
+
+
+def _dtype(coeffs : list) -> 'str | None':
+    """The numpy dtype to store coefficients as, or None to pickle them"""
+    if np is None:
+        return None
+    types = {type(c) for c in coeffs}
+    if types <= {int, bool} and all(-2 ** 63 <= c < 2 ** 63 for c in coeffs):
+        return '<i8'
+    if types <= {float, int, bool} and float in types and all(isinstance(c, float) or abs(c) < 2 ** 53 for c in coeffs):
+        return '<f8'
+    if types <= {complex, float, int, bool} and complex in types and all(not isinstance(c, Integral) or abs(c) < 2 ** 53 for c in coeffs):
+        return '<c16'
+    return None
+
+
+def _read_header(path : Path) -> tuple:
+    with open(path, 'rb') as f:
+        magic, version, dtype, count = HEADER.unpack(f.read(HEADER.size))
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a coefficient file")
+    return dtype.rstrip(b'\0').decode(), count
+
+
+def _write_array(f, dtype : str, coeffs : list):
+    f.write(HEADER.pack(MAGIC, VERSION, dtype.encode(), len(coeffs)))
+    f.write(np.asarray(coeffs, dtype=dtype).tobytes())
+
+
+def _append(path : Path, dtype : str, coeffs : list, stored : int):
+    """Extend a coefficient file in place. The count is only updated once the data is written."""
+    with open(path, 'r+b') as f:
+        f.seek(HEADER.size + stored * np.dtype(dtype).itemsize)
+        f.write(np.asarray(coeffs, dtype=dtype).tobytes())
+        f.flush()
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, dtype.encode(), stored + len(coeffs)))
+
+
+def _replace(path : Path, write):
+    """Write a file atomically, so that readers never see it half written"""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write(f)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
@@ -1,13 +1,36 @@
-from dataclasses import dataclass
-from functools import lru_cache
-from typing import Callable
-from numbers import Integral, Number, Real
-import cmath
+from dataclasses import dataclass, field
+from typing import Callable, ClassVar, Iterable, Iterator
+from numbers import Integral, Number, Rational, Real
+import weakref
 from wilf.symbolics import Expression, SymbolicExpression
 
-from wilf.utils import product
+from wilf.cache import CoefficientCache
+from wilf.multivariate import MultivariatePolynomial
+from wilf import newton
+from wilf.rings import Ring, QQ, SR, RealField, common_ring
+from wilf.utils import postorder, product
 
-@dataclass
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class _CoefficientFunction:
+    """PowerSeries.f, which reads coefficients through the buffer.
+
+    Assigning to f (as the dataclass __init__ does) sets the function that
+    fills the buffer. Nothing bound to the series is stored on it, so a
+    series that is no longer used is freed straight away, rather than
+    waiting for the cyclic garbage collector.
+    """
+    def __get__(self, series, owner=None):
+        return self if series is None else series._coefficient
+
+    def __set__(self, series, f):
+        series._generator = f
+
+
+@dataclass(eq=False)
 class PowerSeries:
     """A formal power series defined by a coefficient function.
     
@@ -17,45 +40,233 @@ class PowerSeries:
 
     Where f is a coefficient function f :: int -> float
 
+    Coefficients are held in a dense buffer which is extended in order on
+    demand, so asking for f(n) computes each of f(0), ..., f(n) exactly once.
+    After construction, self.f reads from (and fills) that buffer; the original
+    coefficient function is only ever called with consecutive indices.
+
+    All buffers are tracked by PowerSeries.cache, which counts hits and misses,
+    estimates the memory held, and can enforce a global memory budget.
+
+    Coefficients live in a ring (see wilf.rings), which defaults to SR: any
+    coefficient type with Python's own arithmetic. Every coefficient is
+    coerced into the ring as it enters the buffer.
+
     """
     f : Callable[int, Expression]
+    ring : Ring = field(default=SR, repr=False)
+
+    cache : ClassVar[CoefficientCache] = CoefficientCache()
+
+    def __reduce__(self):
+        # The buffer isn't pickled, only the definition. This needs a
+        # picklable coefficient function, e.g. one defined at module level.
+        return (PowerSeries, (self._generator, self.ring))
 
     def __post_init__(self):
-        """Post init hook. Used to memoise the coefficient function"""
-        self.f = lru_cache(self.f)
-        self._pow_cache = {}
+        """Post init hook. The coefficient function is already behind the buffer (see _CoefficientFunction)"""
+        self._coeffs = []
+        self._pow_cache = weakref.WeakValueDictionary()
+
+    def _generate(self) -> Callable[[int], Expression]:
+        """The function that computes coefficients for the buffer, in order"""
+        return self._generator
+
+    def _coefficient(self, i : int) -> Expression:
+        """Return the i-th coefficient, filling the buffer up to i if needed"""
+        if i < 0:
+            return 0
+        coeffs = self._coeffs
+        if i < len(coeffs):
+            self.cache.hit(self)
+            return coeffs[i]
+        self.cache.misses += 1
+        self.cache.fill(self, i + 1)
+        return self._coeffs[i]
+
+    def _extend(self, n : int):
+        """Fill the coefficient buffer, in order, until it holds n coefficients"""
+        coeffs = self._coeffs
+        generator = self._generate()
+        coerce = self.ring.coerce
+        for i in range(len(coeffs), n):
+            coeffs.append(coerce(generator(i)))
+
+    def _prefix(self, n : int) -> list:
+        """Return the coefficient buffer, filled to at least n coefficients.
+
+        The returned list is the buffer itself and must not be modified.
+        """
+        if len(self._coeffs) < n:
+            self.cache.fill(self, n)
+        elif self.cache.profiler is not None:
+            self.cache.profiler.hit(self)
+        return self._coeffs
 
     def __repr__(self):
         """Return a polynomial representation of the power series"""
         N = 6
-        out = []
+        terms = []
         i = 0 
-        ss_digits = "⁰¹²³⁴⁵⁶⁷⁸⁹"
-        while len(out) < N and i < 100:
+        while len(terms) < N and i < 100:
             coef = self.f(i)
-
             if coef != 0:
-                if i == 0:
-                    out.append(str(coef))
-                elif i == 1:
-                    out.append(f'{"" if coef == 1 else coef}x')
-                else:
-                    exponent = ''.join(ss_digits[int(d)] for d in str(i))
-                    out.append(f'{"" if coef == 1 else coef}x{exponent}')
+                terms.append((i, coef))
             i += 1
-        s = ' + '.join(out).replace(" + -", " - ")
-        return f"<{s} + ...>"
+        return f"<{_format_terms(terms)} + ...>"
+
+    def coefficients(self, n : int) -> list:
+        """The first n coefficients, as a list.
 
-    def __call__(self, x : float, precision : int = 30):
-        return sum(self.f(i) * x ** i for i in range(precision))
+        Every node the series depends on computes the prefix it needs in one
+        pass, rather than one coefficient at a time.
+        """
+        if len(self._coeffs) < n:
+            self.cache.misses += 1
+            return self._prefix(n)[:n]
+        # cache.hit also tells the profiler, so _prefix isn't asked as well
+        self.cache.hit(self)
+        return self._coeffs[:n]
+
+    def take(self, n : int) -> 'np.ndarray':
+        """The first n coefficients, as a numpy array.
+
+        Coefficients that numpy can't hold natively (e.g. large ints,
+        fractions, symbolic expressions) give an array of dtype object.
+        """
+        if np is None:
+            raise ImportError("PowerSeries.take requires numpy")
+        coeffs = self.coefficients(n)
+        try:
+            out = np.array(coeffs)
+        except OverflowError:
+            out = None
+        if out is None or out.dtype.kind not in 'biufc':
+            out = np.empty(n, dtype=object)
+            out[:] = coeffs
+        return out
+
+    @property
+    def operands(self) -> tuple:
+        """The series this one is computed from"""
+        return ()
+
+    def _label(self) -> str:
+        return type(self).__name__
+
+    def _dependencies(self) -> list:
+        """(series, offset) pairs: extending to n coefficients reads each series up to n + offset"""
+        return []
+
+    def _schedule(self, n : int) -> list:
+        """The series this one depends on, with the number of coefficients needed from each.
+
+        The list is in dependency order, ending with (self, n), so extending
+        each series in turn never needs to extend another one first. The graph
+        is walked with an explicit stack, so its depth is not limited by the
+        recursion limit.
+        """
+        if all(len(d._coeffs) >= n + offset for d, offset in self._dependencies()):
+            return [(self, n)]
+        order = postorder(self, lambda series: [d for d, _ in series._dependencies()])
+        need = {id(self): n}
+        for series in reversed(order):
+            m = need[id(series)]
+            for d, offset in series._dependencies():
+                need[id(d)] = max(need.get(id(d), 0), m + offset)
+        return [(series, need[id(series)]) for series in order]
+
+    def explain(self, n : int = None) -> str:
+        """A text tree of the nodes this series is computed from.
+
+        Shared nodes are numbered, and only expanded the first time they
+        appear. Linear nodes that are fused into their parent are marked as
+        such. If n is given, nodes with a block kernel are marked with whether
+        extending them to n coefficients would use it, or go coefficient by
+        coefficient.
+        """
+        lines = []
+        for series, depth, number, first, fused in _walk([self]):
+            indent = '  ' * depth
+            if not first:
+                lines.append(f'{indent}#{number} (shared)')
+                continue
+            notes = [f'{len(series._coeffs)} buffered']
+            if fused:
+                notes.append('fused')
+            if n is not None and isinstance(series, DerivedSeries) and series._has_block():
+                m = len(series._coeffs)
+                if n > m:
+                    notes.append('block' if n - m >= max(m, series.BLOCK_CUTOFF) else 'online')
+            lines.append(f'{indent}#{number} {series._label()} over {series.ring} [{", ".join(notes)}]')
+        return '\n'.join(lines)
+
+    # Streams extend the buffer in chunks that double in size up to this
+    STREAM_CHUNK = 1024
+
+    def __iter__(self) -> Iterator[Expression]:
+        return self.stream()
+
+    def stream(self, start : int = 0) -> Iterator[Expression]:
+        """Yield the coefficients from index start onwards, in order.
+
+        The buffer is extended a chunk at a time, so the overhead per
+        coefficient is constant. Chunks start small, so only a few more
+        coefficients are computed than are consumed, and double in size up to
+        STREAM_CHUNK. See wilf.streams for combinators.
+        """
+        i = start
+        chunk = 1
+        while True:
+            coeffs = self._prefix(i + chunk)
+            for c in coeffs[i:i + chunk]:
+                yield c
+            i += chunk
+            chunk = min(2 * chunk, self.STREAM_CHUNK)
+
+    def __call__(self, x : 'Expression | np.ndarray', precision : int = 30, tol : float = None, max_precision : int = 2 ** 16):
+        """Evaluate the series at x, a number or a numpy array of points.
+
+        The first precision coefficients are summed by Horner's scheme. For an
+        array, every point is evaluated in one vectorised pass over the
+        coefficients, which are converted to floats (or complex numbers) first.
+
+        If tol is given, blocks of further coefficients, each as long as all the
+        previous ones, are added until a block changes the value by at most tol
+        at every point. If that hasn't happened within max_precision
+        coefficients (e.g. because x is outside the radius of convergence), a
+        ValueError is raised.
+        """
+        array = np is not None and isinstance(x, np.ndarray)
+        value = _horner(self.coefficients(precision), x, array)
+        if tol is None:
+            return value
+        error = ValueError(f"Series did not converge to within {tol} in {max_precision} terms")
+        n = precision
+        while True:
+            if n >= max_precision:
+                raise error
+            m = min(2 * n, max_precision)
+            try:
+                tail = x ** n * _horner(self.coefficients(m)[n:], x, array)
+            except OverflowError:
+                raise error from None
+            value = value + tail
+            n = m
+            if (np.max(np.abs(tail)) if array else abs(tail)) <= tol:
+                return value
+
+    def over(self, ring : Ring) -> 'PowerSeries':
+        """This series with its coefficients coerced into another ring"""
+        return _node(Conversion, self, ring)
 
     def __add__(self, other : 'PowerSeries | Expression') -> 'PowerSeries':
         match other:
             case PowerSeries():
-                f = lambda i: self.f(i) + other.f(i)
-            case SymbolicExpression() | Number():
-                f = lambda i: self.f(i) + other if i == 0 else self.f(i)
-        return PowerSeries(f=f)
+                return _node(Addition, self, other)
+            case SymbolicExpression() | MultivariatePolynomial() | Number():
+                return _node(PlusConstant, self, self.ring.coerce(other))
+        return NotImplemented
 
     def __radd__(self, other : 'Expression') -> 'PowerSeries':
         return self + other
@@ -63,79 +274,132 @@ class PowerSeries:
     def __sub__(self, other : 'PowerSeries | Expression') -> 'PowerSeries':
         match other:
             case PowerSeries():
-                return PowerSeries(f=lambda i: self.f(i) - other.f(i))
-            case SymbolicExpression() | Number():
-                return PowerSeries(f=lambda i: self.f(i) - other if i == 0 else self.f(i))
+                return _node(Difference, self, other)
+            case SymbolicExpression() | MultivariatePolynomial() | Number():
+                return _node(PlusConstant, self, -self.ring.coerce(other))
 
     def __rsub__(self, other : 'Expression') -> 'PowerSeries':
         return -self + other
 
     def __neg__(self) -> 'PowerSeries':
-        return PowerSeries(f=lambda i: -self.f(i))
+        return _node(Negation, self)
 
     def __mul__(self, other : 'Expression | PowerSeries') -> 'PowerSeries':
         match other:
-            case Number() | SymbolicExpression():
-                f = lambda i: self.f(i) * other
+            case Number() | SymbolicExpression() | MultivariatePolynomial():
+                return _node(ScalarMultiple, self, self.ring.coerce(other))
+            case Polynomial():
+                return _node(PolynomialProduct, self, other)
+            case SparseSeries() if other._small():
+                return _node(SparseProduct, self, other)
+            case Reciprocal() if _sparse_tail(other.a) is not None:
+                # a * (1/s) is a / s, which is a recurrence over the terms of s
+                return _node(SparseQuotient, self, other.a)
             case PowerSeries():
-                f = lambda i : sum(self.f(j) * other.f(i - j) for j in range(i+1))
-        return PowerSeries(f=f)
+                return _node(CauchyProduct, self, other)
+        return NotImplemented
 
     def __rmul__(self, other : 'Expression | PowerSeries') -> 'PowerSeries':
         return self * other
 
     def __truediv__(self, other : 'Expression | PowerSeries') -> 'PowerSeries':
         match other:
+            case SparseSeries() | Polynomial() if other._small():
+                # Dividing by x^k s with s_0 != 0 divides self by x^k, which
+                # needs the terms of self below x^k to be zero. They are
+                # checked when the first coefficient is computed.
+                k = min(other.terms, default=0)
+                if k > 0:
+                    return _node(Shift, self, -k, True) / other.shift(-k)
+                return _node(SparseQuotient, self, other)
             case PowerSeries():
                 return self * other.inverse() 
-            case SymbolicExpression() | Number():
-                return PowerSeries(f=lambda i: self.f(i) / other)
+            case SymbolicExpression() | MultivariatePolynomial() | Number():
+                return _node(ScalarQuotient, self, self.ring.coerce(other))
 
     def __rtruediv__(self, other : 'Expression | PowerSeries') -> 'PowerSeries':
+        if isinstance(other, Number) and other == 1:
+            return self.inverse()
         return other * self.inverse()
 
-    def inverse(self):
-        a = self.f(0)
-        q = 1 - self / a
-        print(a)
-        return PowerSeries(f=lambda n: sum((q**i).f(n) for i in range(n+1)) / a) 
+    def shift(self, k : int) -> 'PowerSeries':
+        """self * x^k. A negative k drops the first -k terms and divides by x^-k."""
+        return _node(Shift, self, k)
+
+    def inverse(self) -> 'PowerSeries':
+        """The multiplicative inverse 1/self. Requires a non-zero constant term."""
+        return _node(Reciprocal, self)
+
+    # Integer powers at least this large use the Miller recurrence rather than
+    # repeated squaring, provided the constant term is a non-zero number and
+    # the coefficients are known to be numbers (see _numeric)
+    MILLER_CUTOFF = 16
 
     def __pow__(self, other : 'Expression') -> 'PowerSeries':
-        # Memoised power function... Maybe there's a cleaner way to do this?
+        # Powers are memoised for as long as something else holds on to them.
+        # Exponents are compared by type and value, as in _node, so that e.g.
+        # a**0.5 doesn't return a**Fraction(1, 2).
+        key = (type(other), other)
+        power = self._pow_cache.get(key)
+        if power is not None:
+            self.cache.pow_hits += 1
+            return power
+        self.cache.pow_misses += 1
+        power = self._pow_cache[key] = self._power(other)
+        return power
+
+    def _power(self, other : 'Expression') -> 'PowerSeries':
         match other:
+            case Integral() if other < 0:
+                return self.inverse() ** -other
+            case Integral() if other >= self.MILLER_CUTOFF and self._numeric() and _is_nonzero_number(self.f(0)):
+                return _node(RealPower, self, other)
             case Integral():
-                def pow(i):
-                    if i == 0:
-                        return PowerSeries.one
-                    else:
-                        i2 = self ** (i // 2)
-                        return i2 * i2 if i % 2 == 0 else i2 * i2 * self
+                return self._binary_power(other)
             case Real():
-                def pow(i):
-                    a = self.f(0)
-                    ar = a ** i
-                    q = self / a - 1
-                    def coef(n : int):
-                        return product(i - j for j in range(n)) / product(range(1, n+1))
-                    def f(n : int) -> float:
-                        return sum(coef(j)*(q**j).f(n) for j in range(n+1)) * ar
-                    return PowerSeries(f=f)
+                return _node(RealPower, self, other)
             case _:
                 raise NotImplementedError(f"Can't raise {self} to {other}")
 
-        return self._pow_cache.setdefault(other, pow(other))
+    def _numeric(self) -> bool:
+        """Whether every coefficient is known to be a number.
+
+        The Miller recurrence divides, which would turn exact symbolic
+        coefficients into floats, so integer powers only use it when this holds.
+        """
+        return self.ring is not SR
+
+    def _binary_power(self, k : int) -> 'PowerSeries':
+        """self ** k for k >= 0 by repeated squaring, memoising the powers on the way"""
+        if k == 0:
+            return PowerSeries(_one, ring=self.ring)
+        # Halve k until reaching 1 or a power that's already known, then
+        # square back up.
+        chain = []
+        power = self
+        while k > 1:
+            known = self._pow_cache.get((type(k), k))
+            if known is not None:
+                power = known
+                break
+            chain.append(k)
+            k //= 2
+        for e in reversed(chain):
+            power = power * power if e % 2 == 0 else power * power * self
+            self._pow_cache[type(e), e] = power
+        return power
 
     @classmethod
     @property
     def one(cls):
         """Constructs the trivial power series 1"""
-        return cls(lambda i: 1 if i==0 else 0)
+        return _sparse({0: 1})
 
     @classmethod
     @property
     def x(cls):
         """Constructs the trivial power series x"""
-        return cls(lambda i: 1 if i==1 else 0)
+        return _sparse({1: 1})
 
     @classmethod
     @property
@@ -143,37 +407,1112 @@ class PowerSeries:
         return exp(cls.one)
 
 
+PowerSeries.f = _CoefficientFunction()
+
+
 def derivative(x:PowerSeries, n:int = 1) -> 'PowerSeries':
-    def f(k: int):
-        return product(range(k + 1, k + n + 1)) * x.f(k + n)
-    return PowerSeries(f=f)
+    return _node(Derivative, x, n)
 
 
 def integral(x:PowerSeries, n:int = 1) -> PowerSeries:
     if n != 1:
         raise NotImplementedError("Haven't gotten around to higher order integrals yet. You'll just need to call it multiple times.")
-
-    def f(k: int):
-        if k == 0:
-            return 0
-        else:
-            return x.f(k-1) / k
-    return PowerSeries(f=f)
+    return _node(Antiderivative, x)
 
 
 def exp(x : PowerSeries) -> PowerSeries:
-    a = x.f(0)
-    q = x - a
-    # TODO: Needs to support symbolic expression... ?
-    ea = cmath.exp(1) ** a
-    def fact(n: int):
-        return product(range(1, n+1))
-    return PowerSeries(lambda n: sum((q**i).f(n) / fact(i) for i in range(n+1)) * ea)
+    """exp(x), computed from the differential equation g' = x' g"""
+    return _node(Exponential, x)
+
+
+def log(x : PowerSeries) -> PowerSeries:
+    """log(x), computed from the differential equation x h' = x'"""
+    return _node(Logarithm, x)
 
 
 def cos(x: PowerSeries) -> PowerSeries:
-    return (exp(1j * x) + exp(-1j * x)) / 2
+    return _node(Sine, x).cosine
 
 
 def sin(x: PowerSeries) -> PowerSeries:
-    return (exp(1j * x) - exp(-1j * x)) / 2j
\ No newline at end of file
+    return _node(Sine, x)
+
+
+def atan(x : PowerSeries) -> PowerSeries:
+    """atan(x), as the integral of x' / (1 + x^2)"""
+    return integral(derivative(x) / (1 + x * x)) + x.ring.constant('atan', x.f(0))
+
+
+class SparseSeries(PowerSeries):
+    """A power series with finitely many non-zero terms, e.g. 1 - x^5.
+
+    The terms are kept as a dict from exponents to coefficients. Sums,
+    differences, scalar multiples, shifts and (small) products and powers of
+    sparse series are computed straight away, as sparse series. Where a dense
+    series is multiplied or divided by a sparse one with at most SPARSE_CUTOFF
+    terms, only the non-zero terms take part (see SparseProduct and
+    SparseQuotient), and so do the recurrences of 1/s, exp(s) and s**alpha.
+
+    PowerSeries.x and PowerSeries.one are sparse, so e.g. 1 - x**k is too.
+    """
+    # Sparse series with more terms than this are treated as dense
+    SPARSE_CUTOFF = 64
+
+    def __init__(self, terms : 'dict | Iterable[tuple]', ring : Ring = SR):
+        terms = dict(terms)
+        coerce = ring.coerce
+        self.terms = {}
+        for e in sorted(terms):
+            if e < 0:
+                raise ValueError(f"Negative exponent {e} in a power series")
+            c = coerce(terms[e])
+            if not _is_zero(c):
+                self.terms[e] = c
+        super().__init__(f=None, ring=ring)
+
+    def _generate(self):
+        return self._term
+
+    def _term(self, i : int) -> Expression:
+        return self.terms.get(i, 0)
+
+    def __reduce__(self):
+        return (_sparse, (self.terms, self.ring))
+
+    def __repr__(self):
+        return f"<{_format_terms(self.terms.items()) or '0'}>"
+
+    def _label(self):
+        return f'_sparse({len(self.terms)} terms)'
+
+    @property
+    def degree(self) -> int:
+        """The largest exponent with a non-zero coefficient, or -1 for 0"""
+        return max(self.terms, default=-1)
+
+    def _small(self) -> bool:
+        return len(self.terms) <= self.SPARSE_CUTOFF
+
+    def _numeric(self):
+        return super()._numeric() or all(isinstance(c, Number) for c in self.terms.values())
+
+    def _tail(self) -> list:
+        """(exponent, coefficient) for the terms above the constant term, in order"""
+        return [(e, c) for e, c in self.terms.items() if e > 0]
+
+    def _combine(self, other : 'SparseSeries', sign : int) -> 'SparseSeries':
+        ring = common_ring(self.ring, other.ring)
+        terms = dict(self.terms)
+        for e, c in other.terms.items():
+            c = c if sign == 1 else -c
+            terms[e] = terms[e] + c if e in terms else c
+        return _sparse(terms, ring)
+
+    def _constant(self, c : Expression) -> 'SparseSeries':
+        return _sparse({0: self.ring.coerce(c)}, self.ring)
+
+    def __add__(self, other):
+        match other:
+            case SparseSeries():
+                return self._combine(other, 1)
+            case Polynomial():
+                return other + self
+            case SymbolicExpression() | MultivariatePolynomial() | Number():
+                return self._combine(self._constant(other), 1)
+        return super().__add__(other)
+
+    def __sub__(self, other):
+        match other:
+            case SparseSeries():
+                return self._combine(other, -1)
+            case Polynomial():
+                return -other + self
+            case SymbolicExpression() | MultivariatePolynomial() | Number():
+                return self._combine(self._constant(other), -1)
+        return super().__sub__(other)
+
+    def __neg__(self):
+        return _sparse({e: -c for e, c in self.terms.items()}, self.ring)
+
+    def __mul__(self, other):
+        match other:
+            case Number() | SymbolicExpression() | MultivariatePolynomial():
+                c = self.ring.coerce(other)
+                return _sparse({e: _scale(v, c) for e, v in self.terms.items()}, self.ring)
+            case SparseSeries() if len(self.terms) * len(other.terms) <= self.SPARSE_CUTOFF ** 2:
+                terms = {}
+                for e, c in self.terms.items():
+                    for f, d in other.terms.items():
+                        terms[e + f] = terms[e + f] + c * d if e + f in terms else c * d
+                return _sparse(terms, common_ring(self.ring, other.ring))
+            case Polynomial():
+                return other * self
+            case PowerSeries() if self._small() and not isinstance(other, SparseSeries):
+                return other * self
+        return super().__mul__(other)
+
+    def __truediv__(self, other):
+        match other:
+            case SymbolicExpression() | MultivariatePolynomial() | Number():
+                divide = self.ring.divide
+                other = self.ring.coerce(other)
+                return _sparse({e: divide(c, other) for e, c in self.terms.items()}, self.ring)
+        return super().__truediv__(other)
+
+    def _power(self, other):
+        # Small powers stay sparse; large ones are left to the dense kernels,
+        # which compute coefficients lazily
+        if isinstance(other, Integral) and other >= 0 and (len(self.terms) <= 1 or other * self.degree < self.SPARSE_CUTOFF):
+            power = _sparse({0: 1}, self.ring)
+            base = self
+            while other:
+                if other & 1:
+                    power = power * base
+                other >>= 1
+                if other:
+                    base = base * base
+            return power
+        return super()._power(other)
+
+    def shift(self, k : int) -> 'SparseSeries':
+        return _sparse({e + k: c for e, c in self.terms.items() if e + k >= 0}, self.ring)
+
+    def over(self, ring : Ring) -> 'SparseSeries':
+        return _sparse(self.terms, ring)
+
+
+class Polynomial(PowerSeries):
+    """A power series with finitely many terms, stored densely up to its degree.
+
+    Polynomials are closed under +, -, * and non-negative integer powers,
+    which are computed straight away, with products by fast convolution (see
+    Ring.convolve). divmod, // and % give division with remainder, and gcd
+    the greatest common divisor, when leading coefficients can be inverted.
+    Dividing with / gives a power series, as for any other series.
+
+    A series times a polynomial of degree d only reads d + 1 coefficients of
+    the series for each of its own (see PolynomialProduct). Dividing by a
+    polynomial with at most SparseSeries.SPARSE_CUTOFF terms, and 1/p, exp(p)
+    and p**alpha, are recurrences over its terms, as for sparse series.
+
+        >>> x = Polynomial.x
+        >>> (1 + x) ** 3
+        <1 + 3x + 3x² + x³>
+    """
+    def __init__(self, coeffs : Iterable = (), ring : Ring = SR):
+        coerce = ring.coerce
+        coeffs = [coerce(c) for c in coeffs]
+        while coeffs and _is_zero(coeffs[-1]):
+            coeffs.pop()
+        self.coeffs = coeffs
+        super().__init__(f=None, ring=ring)
+
+    def _generate(self):
+        return self._term
+
+    def _term(self, i : int) -> Expression:
+        return self.coeffs[i] if i < len(self.coeffs) else 0
+
+    def _extend(self, n : int):
+        buffer = self._coeffs
+        buffer.extend(self.coeffs[len(buffer):n])
+        buffer.extend([self.ring.coerce(0)] * (n - len(buffer)))
+
+    def __reduce__(self):
+        return (Polynomial, (self.coeffs, self.ring))
+
+    def __repr__(self):
+        return f"<{_format_terms(self.terms.items()) or '0'}>"
+
+    def _label(self):
+        return f'Polynomial(degree {self.degree})'
+
+    def __call__(self, x : 'Expression | np.ndarray') -> 'Expression | np.ndarray':
+        """Evaluate the polynomial at x, a number or a numpy array of points"""
+        return _horner(self.coeffs, x, np is not None and isinstance(x, np.ndarray))
+
+    @property
+    def degree(self) -> int:
+        """The largest exponent with a non-zero coefficient, or -1 for 0"""
+        return len(self.coeffs) - 1
+
+    @property
+    def terms(self) -> dict:
+        """The non-zero terms, as a dict from exponents to coefficients"""
+        return {e: c for e, c in enumerate(self.coeffs) if not _is_zero(c)}
+
+    def _small(self) -> bool:
+        return sum(not _is_zero(c) for c in self.coeffs) <= SparseSeries.SPARSE_CUTOFF
+
+    def _tail(self) -> list:
+        """(exponent, coefficient) for the non-zero terms above the constant term, in order"""
+        return [(e, c) for e, c in enumerate(self.coeffs) if e > 0 and not _is_zero(c)]
+
+    def _operand(self, other) -> 'Polynomial | None':
+        """other as a polynomial, if it is a constant or a finite series"""
+        match other:
+            case Polynomial():
+                return other
+            case SparseSeries():
+                return Polynomial([other.terms.get(e, 0) for e in range(other.degree + 1)], other.ring)
+            case Number() | SymbolicExpression() | MultivariatePolynomial():
+                return Polynomial([other], self.ring)
+        return None
+
+    def _lacunary(self, other) -> bool:
+        """Whether other is a sparse series of so high a degree that it should
+        stay sparse, rather than be expanded into a dense polynomial"""
+        return isinstance(other, SparseSeries) and other.degree > max(self.degree, SparseSeries.SPARSE_CUTOFF)
+
+    def _as_sparse(self) -> SparseSeries:
+        return _sparse(self.terms, self.ring)
+
+    def __add__(self, other):
+        if self._lacunary(other):
+            return self._as_sparse() + other
+        q = self._operand(other)
+        if q is None:
+            return super().__add__(other)
+        return Polynomial(_add_coefficients(self.coeffs, q.coeffs, 1), common_ring(self.ring, q.ring))
+
+    def __sub__(self, other):
+        if self._lacunary(other):
+            return self._as_sparse() - other
+        q = self._operand(other)
+        if q is None:
+            return super().__sub__(other)
+        return Polynomial(_add_coefficients(self.coeffs, q.coeffs, -1), common_ring(self.ring, q.ring))
+
+    def __neg__(self):
+        return Polynomial([-c for c in self.coeffs], self.ring)
+
+    def __mul__(self, other):
+        match other:
+            case Number() | SymbolicExpression() | MultivariatePolynomial():
+                c = self.ring.coerce(other)
+                return Polynomial([_scale(v, c) for v in self.coeffs], self.ring)
+            case SparseSeries() if self._lacunary(other):
+                return self._as_sparse() * other
+            case Polynomial() | SparseSeries():
+                q = self._operand(other)
+                ring = common_ring(self.ring, q.ring)
+                return Polynomial(_multiply_coefficients(self.coeffs, q.coeffs, ring), ring)
+            case PowerSeries():
+                return _node(PolynomialProduct, other, self)
+        return NotImplemented
+
+    def __truediv__(self, other):
+        match other:
+            case SymbolicExpression() | MultivariatePolynomial() | Number():
+                divide = self.ring.divide
+                other = self.ring.coerce(other)
+                return Polynomial([divide(c, other) for c in self.coeffs], self.ring)
+        return super().__truediv__(other)
+
+    def __divmod__(self, other) -> tuple:
+        """(q, r) with self = q * other + r and deg r < deg other.
+
+        The leading coefficient of other must be invertible. q is read off the
+        power series rev(self) / rev(other), where rev reverses the order of
+        the coefficients, so long divisions use the fast series kernels.
+        """
+        d = self._operand(other)
+        if d is None:
+            return NotImplemented
+        if d.degree < 0:
+            raise ZeroDivisionError("Polynomial division by zero")
+        ring = common_ring(self.ring, d.ring)
+        m = self.degree - d.degree + 1
+        if m <= 0:
+            return Polynomial([], ring), self.over(ring)
+        reverse = lambda p: Polynomial(p.coeffs[::-1], ring)
+        q = Polynomial((reverse(self) / reverse(d)).coefficients(m)[::-1], ring)
+        # The terms of self - q * other from x^deg(other) up cancel exactly
+        r = self - q * d
+        return q, Polynomial(r.coeffs[:d.degree], ring)
+
+    def __floordiv__(self, other):
+        result = self.__divmod__(other)
+        return result if result is NotImplemented else result[0]
+
+    def __mod__(self, other):
+        result = self.__divmod__(other)
+        return result if result is NotImplemented else result[1]
+
+    def gcd(self, other : 'Polynomial') -> 'Polynomial':
+        """The monic greatest common divisor of self and other, by Euclid's algorithm.
+
+        Euclid's algorithm needs exact division, so over SR the coefficients
+        must be rational numbers, which are divided in QQ. Over RR and CC, and
+        over SR with other coefficients, this raises ValueError.
+        """
+        a, b = self, self._operand(other)
+        if b is None:
+            raise TypeError(f"gcd needs a polynomial or a finite sparse series, not {type(other).__name__}")
+        ring = common_ring(a.ring, b.ring)
+        if isinstance(ring, RealField):
+            raise ValueError(f"Can't take the gcd of polynomials over {ring}, which has no exact division")
+        if ring is SR:
+            if not all(isinstance(c, Rational) for c in a.coeffs + b.coeffs):
+                raise ValueError("Can't take the gcd of polynomials over SR unless their coefficients are rational")
+            return a.over(QQ).gcd(b.over(QQ)).over(SR)
+        while b.degree >= 0:
+            a, b = b, a % b
+        return a / a.coeffs[-1] if a.degree >= 0 else a
+
+    def _power(self, other):
+        if isinstance(other, Integral) and other >= 0:
+            power = Polynomial([1], self.ring)
+            base = self
+            while other:
+                if other & 1:
+                    power = power * base
+                other >>= 1
+                if other:
+                    base = base * base
+            return power
+        return super()._power(other)
+
+    def shift(self, k : int) -> 'Polynomial':
+        return Polynomial([0] * k + self.coeffs if k >= 0 else self.coeffs[-k:], self.ring)
+
+    def over(self, ring : Ring) -> 'Polynomial':
+        return Polynomial(self.coeffs, ring)
+
+    @classmethod
+    @property
+    def one(cls):
+        """The polynomial 1"""
+        return Polynomial([1])
+
+    @classmethod
+    @property
+    def x(cls):
+        """The polynomial x"""
+        return Polynomial([0, 1])
+
+
+class DerivedSeries(PowerSeries):
+    """A power series computed online from the buffers of other series.
+
+    Subclasses implement _next(n), which computes coefficient n given that all
+    earlier coefficients are already in the buffer. They may also implement
+    _block(n), which returns the coefficients from the end of the buffer up to
+    n in one go (or None if it can't); this is used when a large block of
+    coefficients is requested at once.
+    """
+    # Smallest block of new coefficients worth handing to _block
+    BLOCK_CUTOFF = 64
+
+    def __new__(cls, *args):
+        # Remember the constructor arguments, for pickling
+        self = super().__new__(cls)
+        self._args = args
+        return self
+
+    def __init__(self, ring : Ring = SR):
+        super().__init__(f=None, ring=ring)
+
+    def _generate(self):
+        return self._next
+
+    def _recipe(self) -> tuple:
+        """A function and arguments which rebuild this node"""
+        return _node, (type(self),) + self._args
+
+    def __reduce__(self):
+        # Pickle the whole graph as a flat list of recipes in dependency
+        # order, with operands referred to by position, so that deep graphs
+        # don't run into pickle's recursion limit. Leaves are pickled as is.
+        order = postorder(self, lambda series: [
+            arg for arg in series._recipe()[1] if isinstance(arg, DerivedSeries)
+        ])
+        position = {id(series): i for i, series in enumerate(order)}
+        recipes = []
+        for series in order:
+            function, args = series._recipe()
+            args = tuple(_Ref(position[id(arg)]) if isinstance(arg, DerivedSeries) else arg for arg in args)
+            recipes.append((function, args))
+        return (_rebuild, (recipes,))
+
+    def _next(self, n : int) -> Expression:
+        raise NotImplementedError
+
+    def _block(self, n : int) -> 'list | None':
+        return None
+
+    @property
+    def operands(self):
+        return tuple(getattr(self, name) for name in ('a', 'b') if hasattr(self, name))
+
+    def _label(self):
+        parameters = [f'{name}={getattr(self, name)}' for name in ('c', 'k', 'order', 'alpha') if hasattr(self, name)]
+        return f'{type(self).__name__}({", ".join(parameters)})' if parameters else type(self).__name__
+
+    def _dependencies(self):
+        return [(s, 0) for s in self.operands]
+
+    def _has_block(self) -> bool:
+        # Recurrences over the terms of a sparse operand don't have a block kernel
+        return type(self)._block is not DerivedSeries._block and getattr(self, 'sparse', None) is None
+
+    def _extend(self, n : int):
+        m = len(self._coeffs)
+        if n - m >= max(m, self.BLOCK_CUTOFF):
+            block = self._block(n)
+            if block is not None:
+                self._coeffs.extend(block)
+                return
+        super()._extend(n)
+
+
+class TermwiseSeries(DerivedSeries):
+    """A derived series whose coefficients can be computed independently.
+
+    Subclasses implement _terms(start, n), which returns coefficients start to
+    n - 1 from the operands' buffers. Any number of new coefficients is
+    computed in a single pass, so there is no separate block path.
+    """
+    def _next(self, n : int) -> Expression:
+        return self._terms(n, n + 1)[0]
+
+    def _terms(self, start : int, n : int) -> list:
+        raise NotImplementedError
+
+    def _extend(self, n : int):
+        coerce = self.ring.coerce
+        self._coeffs.extend([coerce(c) for c in self._terms(len(self._coeffs), n)])
+
+
+class LinearSeries(TermwiseSeries):
+    """A termwise series that is a linear combination of series plus a constant.
+
+    Subclasses implement _linear(), giving their own (coefficient, series)
+    pairs and constant term. Chains of linear nodes are fused: a node expands
+    its linear operands, recursively, into one combination of the series at
+    the leaves, and evaluates that in a single kernel. The intermediate nodes
+    are skipped, and their buffers are never filled, unless they already hold
+    coefficients (because something else needed them).
+    """
+    def _linear(self) -> tuple:
+        raise NotImplementedError
+
+    def _dependencies(self):
+        return [(s, 0) for _, s in self._fused()[0]]
+
+    def _fused(self) -> tuple:
+        """The (coefficient, series) pairs and constant after fusion"""
+        def expanded(s):
+            return isinstance(s, LinearSeries) and (s is self or not s._coeffs)
+        # Weights are pushed down from self in topological order, so each node
+        # is expanded once, however many paths lead to it
+        order = postorder(self, lambda s: [t for _, t in s._linear()[0]] if expanded(s) else [])
+        weights = {id(self): 1}
+        leaves = {}
+        constant = 0
+        for s in reversed(order):
+            c = weights[id(s)]
+            if not expanded(s):
+                leaves[id(s)] = s
+                continue
+            terms, k = s._linear()
+            if k is not None:
+                constant = constant + _scale(c, k)
+            for d, t in terms:
+                w = _scale(c, d)
+                weights[id(t)] = weights[id(t)] + w if id(t) in weights else w
+        # Only drop exact zeros, so that e.g. 0.0 * a still gives floats
+        terms = [(weights[key], s) for key, s in leaves.items() if not (type(weights[key]) is int and weights[key] == 0)]
+        return terms, constant
+
+    def _terms(self, start, n):
+        terms, constant = self._fused()
+        out = None
+        for c, s in terms:
+            xs = s._prefix(n)[start:n]
+            if out is None:
+                out = xs if _is_one(c) else [-x for x in xs] if _is_minus_one(c) else [x * c for x in xs]
+            elif _is_one(c):
+                out = [o + x for o, x in zip(out, xs)]
+            elif _is_minus_one(c):
+                out = [o - x for o, x in zip(out, xs)]
+            else:
+                out = [o + x * c for o, x in zip(out, xs)]
+        if out is None:
+            out = [0] * (n - start)
+        if start == 0 and n > 0 and not _is_zero(constant):
+            out[0] = out[0] + constant
+        return out
+
+
+class Addition(LinearSeries):
+    def __init__(self, a : PowerSeries, b : PowerSeries):
+        self.a = a
+        self.b = b
+        super().__init__(common_ring(a.ring, b.ring))
+
+    def _linear(self):
+        return [(1, self.a), (1, self.b)], None
+
+
+class Difference(LinearSeries):
+    def __init__(self, a : PowerSeries, b : PowerSeries):
+        self.a = a
+        self.b = b
+        super().__init__(common_ring(a.ring, b.ring))
+
+    def _linear(self):
+        return [(1, self.a), (-1, self.b)], None
+
+
+class Negation(LinearSeries):
+    def __init__(self, a : PowerSeries):
+        self.a = a
+        super().__init__(a.ring)
+
+    def _linear(self):
+        return [(-1, self.a)], None
+
+
+class PlusConstant(LinearSeries):
+    """a + c for a constant c, which only changes the constant term"""
+    def __init__(self, a : PowerSeries, c : Expression):
+        self.a = a
+        self.c = c
+        super().__init__(a.ring)
+
+    def _linear(self):
+        return [(1, self.a)], self.c
+
+
+class ScalarMultiple(LinearSeries):
+    """a * c for a constant c"""
+    def __init__(self, a : PowerSeries, c : Expression):
+        self.a = a
+        self.c = c
+        super().__init__(a.ring)
+
+    def _linear(self):
+        return [(self.c, self.a)], None
+
+
+class ScalarQuotient(TermwiseSeries):
+    """a / c for a constant c, divided in the ring of a"""
+    def __init__(self, a : PowerSeries, c : Expression):
+        self.a = a
+        self.c = c
+        super().__init__(a.ring)
+
+    def _terms(self, start, n):
+        c = self.c
+        divide = self.ring.divide
+        return [divide(x, c) for x in self.a._prefix(n)[start:n]]
+
+
+class Conversion(TermwiseSeries):
+    """a with its coefficients coerced into another ring"""
+    def __init__(self, a : PowerSeries, ring : Ring):
+        self.a = a
+        super().__init__(ring)
+
+    def _terms(self, start, n):
+        return self.a._prefix(n)[start:n]
+
+
+class Shift(TermwiseSeries):
+    """a * x^k. For negative k, the terms below x^-k are dropped first, or if
+    exact is set, must be zero, so that this is a / x^-k."""
+    def __init__(self, a : PowerSeries, k : int, exact : bool = False):
+        self.a = a
+        self.k = k
+        self.exact = exact
+        super().__init__(a.ring)
+
+    def _dependencies(self):
+        return [(self.a, -self.k)]
+
+    def _terms(self, start, n):
+        k = self.k
+        a = self.a._prefix(n - k)
+        if self.exact and start == 0 and not all(_is_zero(c) for c in a[:-k]):
+            raise ZeroDivisionError(f"Can't divide a series by x^{-k}: it has a non-zero term below x^{-k}")
+        return [a[i - k] if i >= k else 0 for i in range(start, n)]
+
+
+class Derivative(TermwiseSeries):
+    """The order-th derivative of a"""
+    def __init__(self, a : PowerSeries, order : int = 1):
+        self.a = a
+        self.order = order
+        super().__init__(a.ring)
+
+    def _dependencies(self):
+        return [(self.a, self.order)]
+
+    def _terms(self, start, n):
+        order = self.order
+        a = self.a._prefix(n + order)
+        return [product(range(k + 1, k + order + 1)) * a[k + order] for k in range(start, n)]
+
+
+class Antiderivative(TermwiseSeries):
+    """The integral of a with constant term 0"""
+    def __init__(self, a : PowerSeries):
+        self.a = a
+        super().__init__(a.ring)
+
+    def _dependencies(self):
+        return [(self.a, -1)]
+
+    def _terms(self, start, n):
+        a = self.a._prefix(n - 1)
+        divide = self.ring.divide
+        return [0 if k == 0 else divide(a[k - 1], k) for k in range(start, n)]
+
+
+class CauchyProduct(DerivedSeries):
+    """The product of two power series.
+
+    Coefficients are computed online, in order, from the operands' buffers.
+    When a block of coefficients is requested at once (e.g. f(1000) on a fresh
+    series), the operand prefixes are materialised and multiplied with a fast
+    convolution kernel instead, keeping whatever prefix was already computed.
+    """
+    def __init__(self, a : PowerSeries, b : PowerSeries):
+        self.a = a
+        self.b = b
+        super().__init__(common_ring(a.ring, b.ring))
+
+    def _next(self, n : int) -> Expression:
+        a = self.a._prefix(n + 1)
+        b = self.b._prefix(n + 1)
+        return sum(a[j] * b[n - j] for j in range(n + 1))
+
+    def _block(self, n : int) -> list:
+        a = self.a._prefix(n)
+        b = self.b._prefix(n)
+        return self.ring.convolve(a, b, n)[len(self._coeffs):]
+
+
+class Reciprocal(DerivedSeries):
+    """The multiplicative inverse of a power series.
+
+    Coefficients follow the recurrence b_n = -(1/a_0) sum_{k=1..n} a_k b_{n-k},
+    computed online. Large blocks of numeric coefficients are computed by Newton
+    iteration on the prefix instead, which costs a few convolutions. If a is
+    sparse, the sum only runs over its terms, and is always used.
+    """
+    def __init__(self, a : PowerSeries):
+        self.a = a
+        self.a0_inverse = a.ring.inverse(a.f(0))
+        self.sparse = _sparse_tail(a)
+        super().__init__(a.ring)
+
+    def _dependencies(self):
+        return [] if self.sparse is not None else [(self.a, 0)]
+
+    def _next(self, n : int) -> Expression:
+        if n == 0:
+            return self.a0_inverse
+        b = self._coeffs
+        if self.sparse is not None:
+            c = -_sparse_sum(self.sparse, b, n)
+        else:
+            a = self.a._prefix(n + 1)
+            c = -sum(a[k] * b[n - k] for k in range(1, n + 1))
+        return c if _is_one(self.a0_inverse) else c * self.a0_inverse
+
+    def _block(self, n : int) -> 'list | None':
+        if self.sparse is not None:
+            return None
+        a = self.a._prefix(n)
+        b = self._coeffs or [self.a0_inverse]
+        if not self.ring.newton_ok(a[:n] + b, division=False):
+            return None
+        return newton.reciprocal(a, b, n, self.ring)[len(self._coeffs):]
+
+
+class SparseProduct(TermwiseSeries):
+    """The product of a series a and a sparse series s.
+
+    Coefficient n is the sum of s_e a_{n-e} over the terms of s, so each
+    costs as many multiplications as s has terms, and only a's buffer is read.
+    """
+    def __init__(self, a : PowerSeries, s : SparseSeries):
+        self.a = a
+        self.b = s
+        super().__init__(common_ring(a.ring, s.ring))
+
+    def _dependencies(self):
+        return [(self.a, 0)]
+
+    def _terms(self, start, n):
+        a = self.a._prefix(n)
+        out = [0] * (n - start)
+        # One pass over the block per term of s
+        for e, c in self.b.terms.items():
+            lo = max(start, e)
+            if lo >= n:
+                break
+            shifted = a[lo - e:n - e]
+            if not _is_one(c):
+                shifted = [c * v for v in shifted]
+            out[lo - start:] = [o + v for o, v in zip(out[lo - start:], shifted)]
+        return out
+
+
+class PolynomialProduct(TermwiseSeries):
+    """The product of a series a and a polynomial p of degree d.
+
+    Coefficient n is the sum of p_e a_{n-e} for e <= d, so each costs d + 1
+    multiplications, rather than n + 1 as in a CauchyProduct. Blocks of at
+    least BLOCK_CUTOFF coefficients convolve p with the stretch of a's buffer
+    they need, using the ring's fast convolution.
+    """
+    def __init__(self, a : PowerSeries, p : Polynomial):
+        self.a = a
+        self.b = p
+        super().__init__(common_ring(a.ring, p.ring))
+
+    def _dependencies(self):
+        return [(self.a, 0)]
+
+    def _terms(self, start, n):
+        p = self.b.coeffs
+        d = len(p) - 1
+        a = self.a._prefix(n)
+        if n - start < self.BLOCK_CUTOFF:
+            return [sum(p[e] * a[k - e] for e in range(min(d, k) + 1)) for k in range(start, n)]
+        lo = max(0, start - d)
+        m = n - lo
+        return self.ring.convolve((p + [0] * m)[:m], a[lo:n], m)[start - lo:]
+
+
+class SparseQuotient(DerivedSeries):
+    """a / s for a sparse series (or polynomial) s with a non-zero constant term.
+
+    From a = b s, b_n = (a_n - sum_{e>=1} s_e b_{n-e}) / s_0, where the sum
+    only runs over the terms of s.
+    """
+    def __init__(self, a : PowerSeries, s : 'SparseSeries | Polynomial'):
+        self.a = a
+        self.b = s
+        ring = common_ring(a.ring, s.ring)
+        self.s0_inverse = ring.inverse(ring.coerce(s.f(0)))
+        self.sparse = s._tail()
+        super().__init__(ring)
+
+    def _dependencies(self):
+        return [(self.a, 0)]
+
+    def _next(self, n : int) -> Expression:
+        c = self.a._prefix(n + 1)[n] - _sparse_sum(self.sparse, self._coeffs, n)
+        return c if _is_one(self.s0_inverse) else c * self.s0_inverse
+
+
+class Exponential(DerivedSeries):
+    """exp(a), from g' = a' g, i.e. n g_n = sum_{k=1..n} k a_k g_{n-k}"""
+    def __init__(self, a : PowerSeries):
+        self.a = a
+        self.sparse = _sparse_tail(a)
+        if self.sparse is not None:
+            self.sparse = [(k, k * c) for k, c in self.sparse]
+        super().__init__(a.ring)
+
+    def _dependencies(self):
+        return [] if self.sparse is not None else [(self.a, 0)]
+
+    def _next(self, n : int) -> Expression:
+        if n == 0:
+            return self.ring.constant('exp', self.a.f(0))
+        if self.sparse is not None:
+            return self.ring.divide(_sparse_sum(self.sparse, self._coeffs, n), n)
+        return _ode_step(self.a._prefix(n + 1), self._coeffs, n, self.ring)
+
+    def _block(self, n : int) -> 'list | None':
+        if self.sparse is not None:
+            return None
+        a = self.a._prefix(n)
+        g = self._coeffs or [self._next(0)]
+        if not self.ring.newton_ok(a[:n] + g, division=True):
+            return None
+        return newton.exp(a, g, n, self.ring)[len(self._coeffs):]
+
+
+class Logarithm(DerivedSeries):
+    """log(a), from a h' = a', i.e. n a_0 h_n = n a_n - sum_{k=1..n-1} k h_k a_{n-k}"""
+    def __init__(self, a : PowerSeries):
+        self.a = a
+        self.a0_inverse = a.ring.inverse(a.f(0))
+        super().__init__(a.ring)
+
+    def _next(self, n : int) -> Expression:
+        a = self.a._prefix(n + 1)
+        if n == 0:
+            return self.ring.constant('log', a[0])
+        h = self._coeffs
+        c = a[n] - self.ring.divide(sum(k * h[k] * a[n - k] for k in range(1, n)), n)
+        return c if _is_one(self.a0_inverse) else c * self.a0_inverse
+
+    def _block(self, n : int) -> 'list | None':
+        a = self.a._prefix(n)
+        if not self.ring.newton_ok(a[:n], division=True):
+            return None
+        h = newton.log(a, n, self.ring)
+        h[0] = self._next(0)
+        return h[len(self._coeffs):]
+
+
+class RealPower(DerivedSeries):
+    """a**alpha for a real exponent alpha, by J.C.P. Miller's recurrence.
+
+    Comparing coefficients in a b' = alpha a' b gives
+
+        n a_0 b_n = sum_{k=1..n} ((alpha + 1) k - n) a_k b_{n-k}
+
+    which needs a non-zero constant term a_0. For integer alpha and integer
+    coefficients the division is exact, so the result stays integral. If a is
+    sparse, the sum only runs over its terms.
+    """
+    def __init__(self, a : PowerSeries, alpha : Real):
+        self.a = a
+        self.alpha = a.ring.coerce(alpha)
+        a0 = a.f(0)
+        if _is_zero(a0):
+            raise ZeroDivisionError(f"Can't raise a series with zero constant term to the power {alpha}")
+        self.a0 = a0
+        self.b0 = a.ring.power(a0, alpha)
+        self.sparse = _sparse_tail(a)
+        super().__init__(a.ring)
+
+    def _dependencies(self):
+        return [] if self.sparse is not None else [(self.a, 0)]
+
+    def _next(self, n : int) -> Expression:
+        if n == 0:
+            return self.b0
+        b = self._coeffs
+        alpha1 = self.alpha + 1
+        if self.sparse is not None:
+            c = 0
+            for k, ak in self.sparse:
+                if k > n:
+                    break
+                c += (alpha1 * k - n) * ak * b[n - k]
+        else:
+            a = self.a._prefix(n + 1)
+            c = sum((alpha1 * k - n) * a[k] * b[n - k] for k in range(1, n + 1))
+        return self.ring.divide(c, n * self.a0)
+
+    def _block(self, n : int) -> 'list | None':
+        if self.sparse is not None:
+            return None
+        a = self.a._prefix(n)
+        b = self._coeffs or [self.b0]
+        if not self.ring.newton_ok(a[:n] + b, division=True):
+            return None
+        return newton.power(a, b, self.alpha, n, self.ring)[len(self._coeffs):]
+
+
+class Sine(DerivedSeries):
+    """sin(a), computed alongside cos(a) from s' = a' c"""
+    def __init__(self, a : PowerSeries, cosine : 'Cosine' = None):
+        self.a = a
+        self.cosine = Cosine(a, self) if cosine is None else cosine
+        super().__init__(a.ring)
+
+    def _recipe(self):
+        return sin, (self.a,)
+
+    def _next(self, n : int) -> Expression:
+        if n == 0:
+            return self.ring.constant('sin', self.a.f(0))
+        return _ode_step(self.a._prefix(n + 1), self.cosine._prefix(n), n, self.ring)
+
+
+class Cosine(DerivedSeries):
+    """cos(a), computed alongside sin(a) from c' = -a' s"""
+    def __init__(self, a : PowerSeries, sine : Sine = None):
+        self.a = a
+        self.sine = Sine(a, self) if sine is None else sine
+        super().__init__(a.ring)
+
+    def _recipe(self):
+        return cos, (self.a,)
+
+    def _next(self, n : int) -> Expression:
+        if n == 0:
+            return self.ring.constant('cos', self.a.f(0))
+        return -_ode_step(self.a._prefix(n + 1), self.sine._prefix(n), n, self.ring)
+
+
+# Live derived series, keyed by their class and arguments, so that building
+# the same expression twice gives the same node, and its buffer is shared.
+_nodes = weakref.WeakValueDictionary()
+
+# Nodes whose operands can be swapped
+_COMMUTATIVE = (Addition, CauchyProduct)
+
+
+def _node(cls : type, *args) -> DerivedSeries:
+    """The derived series cls(*args), shared with an identical live node if there is one.
+
+    Series arguments are compared by identity and other arguments by type and
+    value. A node holds on to its operands, so their ids are never reused
+    while it is alive.
+    """
+    key = tuple(('series', id(arg)) if isinstance(arg, PowerSeries) else ('value', type(arg), arg) for arg in args)
+    if cls in _COMMUTATIVE:
+        key = tuple(sorted(key))
+    key = (cls,) + key
+    try:
+        node = _nodes.get(key)
+    except TypeError:
+        # Unhashable arguments, e.g. numpy arrays; don't share
+        return cls(*args)
+    if node is None:
+        node = _nodes[key] = cls(*args)
+    return node
+
+
+def _walk(roots : list) -> Iterator[tuple]:
+    """Walk the trees below roots depth first, yielding (series, depth, number, first, fused).
+
+    Nodes are numbered in the order they are first reached, and a node
+    reached again is yielded with first=False and not expanded. fused is
+    whether a linear node is fused into its parent.
+    """
+    numbers = {}
+    stack = [(root, 0, False) for root in reversed(roots)]
+    while stack:
+        series, depth, fused = stack.pop()
+        if id(series) in numbers:
+            yield series, depth, numbers[id(series)], False, fused
+            continue
+        numbers[id(series)] = len(numbers) + 1
+        yield series, depth, numbers[id(series)], True, fused
+        linear = isinstance(series, LinearSeries)
+        for operand in reversed(series.operands):
+            stack.append((operand, depth + 1, linear and isinstance(operand, LinearSeries) and not operand._coeffs))
+
+
+def _sparse(terms : 'dict | Iterable[tuple]', ring : Ring = SR) -> SparseSeries:
+    """SparseSeries(terms, ring), shared with an identical live sparse series if there is one"""
+    series = SparseSeries(terms, ring)
+    key = (SparseSeries, ring) + tuple((e, type(c), c) for e, c in series.terms.items())
+    try:
+        node = _nodes.get(key)
+    except TypeError:
+        return series
+    if node is None:
+        node = _nodes[key] = series
+    return node
+
+
+class _Ref(int):
+    """A reference to an earlier node in a pickled graph"""
+
+
+def _rebuild(recipes : list) -> DerivedSeries:
+    """Rebuild a pickled graph from the output of DerivedSeries.__reduce__"""
+    nodes = []
+    for function, args in recipes:
+        args = [nodes[arg] if isinstance(arg, _Ref) else arg for arg in args]
+        nodes.append(function(*args))
+    return nodes[-1]
+
+
+def _one(i : int) -> int:
+    return 1 if i == 0 else 0
+
+
+def _x(i : int) -> int:
+    return 1 if i == 1 else 0
+
+
+def _scale(c : Expression, d : Expression) -> Expression:
+    """c * d, skipping multiplications by 1"""
+    if _is_one(c):
+        return d
+    if _is_one(d):
+        return c
+    return c * d
+
+
+def _ode_step(a : list, g : list, n : int, ring : Ring) -> Expression:
+    """The n-th coefficient of the solution of g' = a' h, i.e. (1/n) sum k a_k h_{n-k}"""
+    return ring.divide(sum(k * a[k] * g[n - k] for k in range(1, n + 1)), n)
+
+
+def _sparse_tail(series : PowerSeries) -> 'list | None':
+    """The terms above the constant term of a small sparse series or polynomial, or None for any other series"""
+    if isinstance(series, (SparseSeries, Polynomial)) and series._small():
+        return series._tail()
+    return None
+
+
+def _sparse_sum(terms : list, b : list, n : int) -> Expression:
+    """sum c b_{n-e} over the (e, c) in terms with e <= n, for terms in order of e"""
+    total = 0
+    for e, c in terms:
+        if e > n:
+            break
+        total += c * b[n - e]
+    return total
+
+
+def _add_coefficients(a : list, b : list, sign : int) -> list:
+    """a + sign * b, for coefficient lists of any lengths"""
+    if len(a) < len(b):
+        a = a + [0] * (len(b) - len(a))
+    return [c + d if sign == 1 else c - d for c, d in zip(a, b)] + a[len(b):]
+
+
+def _multiply_coefficients(a : list, b : list, ring : Ring) -> list:
+    """The full product of two coefficient lists"""
+    if not a or not b:
+        return []
+    n = len(a) + len(b) - 1
+    return ring.convolve(a + [0] * (n - len(a)), b + [0] * (n - len(b)), n)
+
+
+def _format_terms(terms : 'Iterable[tuple]') -> str:
+    """(exponent, coefficient) pairs as a polynomial, e.g. 1 - 2x³"""
+    ss_digits = "⁰¹²³⁴⁵⁶⁷⁸⁹"
+    out = []
+    for i, coef in terms:
+        if i == 0:
+            out.append(str(coef))
+        elif i == 1:
+            out.append(f'{"" if coef == 1 else coef}x')
+        else:
+            exponent = ''.join(ss_digits[int(d)] for d in str(i))
+            out.append(f'{"" if coef == 1 else coef}x{exponent}')
+    return ' + '.join(out).replace(" + -", " - ")
+
+
+def _horner(coeffs : list, x : 'Expression | np.ndarray', array : bool = False) -> 'Expression | np.ndarray':
+    """The polynomial with the given coefficients at x, by Horner's scheme"""
+    if array:
+        # Keep the arithmetic in numpy's own types rather than objects
+        coeffs = [complex(c) if isinstance(c, complex) else float(c) for c in coeffs]
+    value = 0
+    for c in reversed(coeffs):
+        value = value * x + c
+    return value
+
+
+def _is_one(c : Expression) -> bool:
+    return isinstance(c, Number) and c == 1
+
+
+def _is_minus_one(c : Expression) -> bool:
+    return isinstance(c, Number) and c == -1
+
+
+def _is_zero(c : Expression) -> bool:
+    return isinstance(c, Number) and c == 0
+
+
+def _is_nonzero_number(c : Expression) -> bool:
+    return isinstance(c, Number) and c != 0
@@ -0,0 +1,204 @@
+"""Per node statistics on where the time goes when computing coefficients.
+
+Profiling is opt-in. Inside a profile() block, every series that is read or
+extended is recorded: how many coefficients it computed, how long that took,
+how many lookups its buffer answered or missed, and how long its buffer got.
+
+    >>> from wilf.profiling import profile
+    >>> with profile() as p:
+    ...     catalan.coefficients(1000)
+    >>> print(p.report())
+
+The results are available as a text tree (report), as a JSON compatible
+dict (to_dict), and as folded stacks (folded) which flamegraph.pl and
+speedscope read. Outside a profile() block the only cost is one attribute
+check per lookup.
+
+A Profile holds on to the series it records, so they stay alive until the
+Profile is dropped.
+"""
+from contextlib import contextmanager
+from dataclasses import dataclass, asdict
+from typing import Iterator
+import time
+
+from wilf.powerseries import PowerSeries, _walk
+from wilf.utils import postorder
+
+
+@dataclass
+class NodeStats:
+    """What happened to one series while profiling.
+
+    Attributes:
+        hits: Lookups answered from its buffer, including reads by the
+            kernels of series computed from it.
+        misses: Lookups that had to extend its buffer.
+        evaluations: Coefficients it computed.
+        extensions: Times its buffer was extended.
+        seconds: Time spent extending it, not counting time spent extending
+            other series in the middle of that.
+        peak: The longest its buffer got.
+    """
+    hits : int = 0
+    misses : int = 0
+    evaluations : int = 0
+    extensions : int = 0
+    seconds : float = 0.0
+    peak : int = 0
+
+
+class Profile:
+    """Statistics for each series read or extended while it is installed.
+
+    Attributes:
+        nodes: NodeStats for each series, by id.
+        roots: The series that were asked for coefficients from outside any
+            extension, in the order they were first asked.
+    """
+    def __init__(self):
+        self.nodes = {}
+        self.roots = []
+        self._series = {}
+        self._stack = []
+
+    def _stats(self, series : PowerSeries) -> NodeStats:
+        stats = self.nodes.get(id(series))
+        if stats is None:
+            stats = self.nodes[id(series)] = NodeStats(peak=len(series._coeffs))
+            self._series[id(series)] = series
+        return stats
+
+    def hit(self, series : PowerSeries):
+        self._stats(series).hits += 1
+
+    def miss(self, series : PowerSeries, root : bool = False):
+        self._stats(series).misses += 1
+        if root and not any(r is series for r in self.roots):
+            self.roots.append(series)
+
+    def extend(self, series : PowerSeries, n : int):
+        """Extend series to n coefficients, timing it"""
+        stats = self._stats(series)
+        m = len(series._coeffs)
+        # Time spent in nested extensions is subtracted from the outer one
+        self._stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            series._extend(n)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self._stack.pop()
+            if self._stack:
+                self._stack[-1] += elapsed
+        stats.seconds += elapsed - nested
+        stats.extensions += 1
+        stats.evaluations += len(series._coeffs) - m
+        stats.peak = max(stats.peak, len(series._coeffs))
+
+    def __getitem__(self, series : PowerSeries) -> NodeStats:
+        return self.nodes[id(series)]
+
+    def __contains__(self, series : PowerSeries) -> bool:
+        return id(series) in self.nodes
+
+    @property
+    def seconds(self) -> float:
+        """Total time spent extending buffers"""
+        return sum(stats.seconds for stats in self.nodes.values())
+
+    def _trees(self) -> Iterator[tuple]:
+        """_walk over the roots, and any recorded series not reachable from them"""
+        # Roots are only added for lookups from outside an extension, which
+        # every other recorded series should be reachable from, but don't
+        # lose any that aren't.
+        reachable = set()
+        for root in self.roots:
+            reachable.update(id(s) for s in postorder(root, lambda s: s.operands))
+        rest = [s for key, s in self._series.items() if key not in reachable]
+        return _walk(self.roots + rest)
+
+    def report(self) -> str:
+        """A text tree of the recorded series and their statistics.
+
+        As in PowerSeries.explain, shared nodes are numbered, and only
+        expanded the first time they appear. Series that weren't touched
+        while profiling are shown without statistics.
+        """
+        lines = []
+        for series, depth, number, first, fused in self._trees():
+            indent = '  ' * depth
+            if not first:
+                lines.append(f'{indent}#{number} (shared)')
+                continue
+            stats = self.nodes.get(id(series))
+            if stats is None:
+                notes = 'not used'
+            else:
+                notes = (f'{stats.seconds:.6f}s, {stats.evaluations} evaluated in {stats.extensions} extensions, '
+                         f'{stats.hits} hits, {stats.misses} misses, peak {stats.peak}')
+            if fused:
+                notes += ', fused'
+            lines.append(f'{indent}#{number} {series._label()} over {series.ring} [{notes}]')
+        return '\n'.join(lines)
+
+    def to_dict(self) -> dict:
+        """The statistics as a JSON compatible dict.
+
+        Series are numbered as in report(). Each node lists the numbers of its
+        operands, so the graph can be rebuilt from the output.
+        """
+        numbers = {}
+        order = []
+        for series, _, number, first, _ in self._trees():
+            if first:
+                numbers[id(series)] = number
+                order.append(series)
+        nodes = []
+        for series in order:
+            stats = self.nodes.get(id(series))
+            nodes.append({
+                'id': numbers[id(series)],
+                'label': series._label(),
+                'ring': str(series.ring),
+                'operands': [numbers[id(operand)] for operand in series.operands],
+                **asdict(stats if stats is not None else NodeStats(peak=len(series._coeffs))),
+            })
+        return {
+            'roots': [numbers[id(root)] for root in self.roots],
+            'seconds': self.seconds,
+            'nodes': nodes,
+        }
+
+    def folded(self) -> str:
+        """The time per series as folded stacks, in microseconds.
+
+        Each line is a path from a root to a series, with frames separated by
+        semicolons, followed by the time spent in that series. A shared series
+        is put under the path it was first reached by.
+        """
+        lines = []
+        path = []
+        for series, depth, number, first, _ in self._trees():
+            del path[depth:]
+            path.append(f'#{number} {series._label()}'.replace(';', ','))
+            stats = self.nodes.get(id(series))
+            if first and stats is not None and stats.seconds > 0:
+                lines.append(f'{";".join(path)} {round(stats.seconds * 1e6)}')
+        return '\n'.join(lines)
+
+
+@contextmanager
+def profile() -> Iterator[Profile]:
+    """Record statistics for every series used inside the block.
+
+    A profile() inside another one takes over until it ends; what happens in
+    the inner block is not recorded in the outer Profile.
+    """
+    cache = PowerSeries.cache
+    outer = cache.profiler
+    cache.profiler = profile = Profile()
+    try:
+        yield profile
+    finally:
+        cache.profiler = outer
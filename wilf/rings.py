@@ -0,0 +1,292 @@
+"""Coefficient rings for power series.
+
+Every PowerSeries has a ring, which decides how its coefficients are stored,
+divided and multiplied in bulk. The default, SR, takes coefficients as they
+come (numbers, symbolic expressions, polynomials) and uses Python's own
+arithmetic, which is what PowerSeries has always done. The other rings pin the
+coefficients down to one domain:
+
+    ZZ      Python ints. Division must be exact, otherwise it is an error.
+    QQ      Exact rationals, as ints and fractions.Fraction.
+    GF(p)   Integers modulo a prime p, stored as ints in range(p).
+    RR, CC  Python floats and complex numbers.
+
+Convert a series with series.over(ring). Combining a series over SR with one
+over another ring gives a series over the other ring; combining two different
+non-SR rings is an error.
+"""
+from fractions import Fraction
+from numbers import Integral, Number, Rational, Real
+import cmath
+import math
+
+from wilf import convolution
+from wilf.symbolics import Expression, SymbolicExpression, Power
+
+
+# Values of the elementary functions that should stay exact integers
+_EXACT_CONSTANTS = {('exp', 0): 1, ('log', 1): 0, ('sin', 0): 0, ('cos', 0): 1, ('atan', 0): 0}
+
+
+class Ring:
+    """Base class for coefficient rings.
+
+    Subclasses provide coercion of values into the ring, exact division,
+    inverses of units, the values of elementary functions at constant terms,
+    and a convolution kernel for materialised prefixes.
+    """
+    name = 'R'
+    # Whether division by the integers 1, 2, 3, ... is always possible
+    is_field = True
+
+    def __repr__(self):
+        return self.name
+
+    def __reduce__(self):
+        # The rings are singletons, pickled by name
+        return self.name
+
+    def coerce(self, c : Expression) -> Expression:
+        """Convert c to an element of this ring"""
+        return c
+
+    def divide(self, c : Expression, d : Expression) -> Expression:
+        """c/d, where d is a unit (or any non-zero integer, in a field)"""
+        return self.coerce(c * self.inverse(d))
+
+    def inverse(self, c : Expression) -> Expression:
+        """1/c for a unit c"""
+        raise NotImplementedError
+
+    def constant(self, name : str, c : Expression) -> Expression:
+        """The elementary function math.<name> at c"""
+        if isinstance(c, Number) and (name, c) in _EXACT_CONSTANTS:
+            return _EXACT_CONSTANTS[name, c]
+        raise ValueError(f"{name}({c}) is not in {self}")
+
+    def power(self, c : Expression, alpha : Real) -> Expression:
+        """c ** alpha, for the constant term of a series raised to alpha"""
+        if c == 1:
+            return 1
+        if isinstance(alpha, Integral):
+            return self.coerce(c ** alpha) if alpha >= 0 else self.inverse(self.coerce(c ** -alpha))
+        raise ValueError(f"{c}^{alpha} is not in {self}")
+
+    def convolve(self, a : list, b : list, n : int) -> list:
+        """The first n coefficients of the product of a and b"""
+        return convolution.schoolbook(a[:n], b[:n], n)
+
+    def newton_ok(self, coeffs : list, division : bool) -> bool:
+        """Whether the Newton kernels may be used on a prefix.
+
+        division is set when the kernel divides by integers (exp, log, powers)
+        rather than only by the constant term (reciprocals).
+        """
+        return self.is_field or not division
+
+
+class SymbolicRing(Ring):
+    """Coefficients of any type, combined with Python's own arithmetic.
+
+    Division stays in the integers when it is exact, and otherwise falls back
+    to whatever / does for the coefficients involved.
+    """
+    name = 'SR'
+
+    def divide(self, c, d):
+        if isinstance(c, Integral) and isinstance(d, Integral) and c % d == 0:
+            return c // d
+        return c / d
+
+    def inverse(self, c):
+        """1/c, keeping integer units as integers"""
+        if isinstance(c, Integral) and c in (1, -1):
+            return c
+        return 1 / c
+
+    def constant(self, name, c):
+        if isinstance(c, Number) and (name, c) in _EXACT_CONSTANTS:
+            return _EXACT_CONSTANTS[name, c]
+        match c:
+            case Real() if name != 'log' or c > 0:
+                return getattr(math, name)(c)
+            case Number():
+                return getattr(cmath, name)(c)
+            case SymbolicExpression() if name == 'exp':
+                return Power(math.e, c).simplify()
+            case _:
+                raise NotImplementedError(f"Can't take {name} of the symbolic constant {c}")
+
+    def power(self, c, alpha):
+        if isinstance(c, Number):
+            return 1 if c == 1 else c ** alpha
+        return Power(c, alpha).simplify()
+
+    def convolve(self, a, b, n):
+        return convolution.convolve(a, b, n)
+
+    def newton_ok(self, coeffs, division):
+        # Only use Newton on numbers, and don't let it turn integers into
+        # floats where the recurrences would have kept them exact.
+        if not all(isinstance(c, Number) for c in coeffs):
+            return False
+        return not division or any(isinstance(c, (float, complex)) for c in coeffs)
+
+
+class IntegerRing(Ring):
+    name = 'ZZ'
+    is_field = False
+
+    def coerce(self, c):
+        if isinstance(c, Integral):
+            return int(c)
+        if isinstance(c, Rational) and c.denominator == 1 or isinstance(c, float) and c.is_integer():
+            return int(c)
+        raise ValueError(f"{c!r} is not an integer")
+
+    def divide(self, c, d):
+        q, r = divmod(c, d)
+        if r:
+            raise ValueError(f"{c} is not divisible by {d} in {self}")
+        return q
+
+    def inverse(self, c):
+        if c in (1, -1):
+            return c
+        raise ValueError(f"{c} is not a unit in {self}")
+
+    def convolve(self, a, b, n):
+        return convolution.integer_convolve(a, b, n)
+
+
+class RationalField(Ring):
+    name = 'QQ'
+
+    def coerce(self, c):
+        match c:
+            case Integral():
+                return int(c)
+            case Rational():
+                return c.numerator if c.denominator == 1 else Fraction(c.numerator, c.denominator)
+            case float():
+                return self.coerce(Fraction(c))
+            case _:
+                raise ValueError(f"{c!r} is not a rational number")
+
+    def divide(self, c, d):
+        return self.coerce(Fraction(c, self.coerce(d)))
+
+    def inverse(self, c):
+        return self.coerce(Fraction(1, self.coerce(c)))
+
+    def power(self, c, alpha):
+        if isinstance(alpha, float) and alpha.is_integer():
+            alpha = int(alpha)
+        return super().power(c, alpha)
+
+    def convolve(self, a, b, n):
+        return [self.coerce(c) for c in convolution.karatsuba(a[:n], b[:n])[:n]]
+
+
+class ModularRing(Ring):
+    """The integers modulo a prime p.
+
+    Rational numbers coerce to p-adic residues, so e.g. the exponent 1/2 in a
+    square root becomes the inverse of 2 mod p. Division by n needs n < p.
+    """
+    def __init__(self, p : int):
+        self.p = p
+        self.name = f'GF({p})'
+
+    def __eq__(self, other):
+        return isinstance(other, ModularRing) and other.p == self.p
+
+    def __hash__(self):
+        return hash(('GF', self.p))
+
+    def __reduce__(self):
+        return (GF, (self.p,))
+
+    def coerce(self, c):
+        match c:
+            case Integral():
+                return int(c) % self.p
+            case Rational():
+                return c.numerator * self.inverse(c.denominator) % self.p
+            case float() if c.is_integer():
+                return int(c) % self.p
+            case float():
+                return self.coerce(Fraction(c))
+            case _:
+                raise ValueError(f"{c!r} has no residue mod {self.p}")
+
+    def divide(self, c, d):
+        return c * self.inverse(d) % self.p
+
+    def inverse(self, c):
+        try:
+            return pow(self.coerce(c), -1, self.p)
+        except ValueError:
+            raise ValueError(f"{c} is not invertible mod {self.p}") from None
+
+    def power(self, c, alpha):
+        if isinstance(alpha, Integral):
+            return pow(int(c), int(alpha), self.p)
+        return super().power(c, alpha)
+
+    def convolve(self, a, b, n):
+        return convolution.modular_convolve(a, b, n, self.p)
+
+
+class RealField(Ring):
+    name = 'RR'
+    _type = float
+    _math = math
+
+    def coerce(self, c):
+        return self._type(c)
+
+    def divide(self, c, d):
+        return c / d
+
+    def inverse(self, c):
+        return 1 / c
+
+    def constant(self, name, c):
+        return self._type(getattr(self._math, name)(c))
+
+    def power(self, c, alpha):
+        return self._type(c ** alpha)
+
+    def convolve(self, a, b, n):
+        return [self._type(c) for c in convolution.convolve(a, b, n)]
+
+
+class ComplexField(RealField):
+    name = 'CC'
+    _type = complex
+    _math = cmath
+
+
+SR = SymbolicRing()
+ZZ = IntegerRing()
+QQ = RationalField()
+RR = RealField()
+CC = ComplexField()
+
+_modular_rings = {}
+
+def GF(p : int) -> ModularRing:
+    """The integers modulo the prime p"""
+    if p not in _modular_rings:
+        _modular_rings[p] = ModularRing(p)
+    return _modular_rings[p]
+
+
+def common_ring(a : Ring, b : Ring) -> Ring:
+    """The ring to use for a series combining series over a and b"""
+    if a is SR or a == b:
+        return b
+    if b is SR:
+        return a
+    raise TypeError(f"Can't combine series over {a} and {b}")
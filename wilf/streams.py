@@ -0,0 +1,57 @@
+"""Combinators for streams of coefficients.
+
+A stream is any iterator of coefficients in order, such as series.stream()
+(or just iter(series)) for a PowerSeries, or generate(f) for a coefficient
+function. The combinators only keep the state they need, so working through
+a stream a chunk at a time takes no memory beyond the series buffers the
+stream reads from (and none at all for generate).
+
+    >>> fibonacci = iter(1 / (1 - x - x**2))
+    >>> take(scan(operator.add, fibonacci), 6)
+    [1, 2, 4, 7, 12, 20]
+    >>> for batch in chunked(generate(lambda n: n * n), 1000):
+    ...     process(batch)
+"""
+from itertools import accumulate, count, islice
+from typing import Callable, Iterable, Iterator
+
+from wilf.symbolics import Expression
+
+
+def generate(f : Callable[[int], Expression], start : int = 0) -> Iterator[Expression]:
+    """Stream f(start), f(start + 1), ... without buffering anything"""
+    return map(f, count(start))
+
+
+def zip_with(f : Callable[..., Expression], *streams : Iterable[Expression]) -> Iterator[Expression]:
+    """Stream f applied to the coefficients of several streams in lockstep"""
+    return map(f, *streams)
+
+
+def scan(f : Callable[[Expression, Expression], Expression], stream : Iterable[Expression], initial : Expression = None) -> Iterator[Expression]:
+    """Stream the running results of folding f over a stream.
+
+    scan(operator.add, s) gives the partial sums of s, i.e. the coefficients
+    of s / (1 - x). If initial is given, it is yielded first.
+    """
+    return accumulate(stream, f, initial=initial)
+
+
+def chunked(stream : Iterable[Expression], size : int) -> Iterator[list]:
+    """Stream lists of size consecutive coefficients"""
+    stream = iter(stream)
+    while True:
+        chunk = list(islice(stream, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def take(stream : Iterable[Expression], n : int) -> list:
+    """The next n coefficients of a stream"""
+    return list(islice(stream, n))
+
+
+def drop(stream : Iterable[Expression], n : int) -> Iterator[Expression]:
+    """The stream after skipping n coefficients"""
+    return islice(stream, n, None)
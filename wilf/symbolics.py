@@ -1,71 +1,152 @@
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from numbers import Number
-from typing import Dict, Tuple
+from math import gcd
+from numbers import Integral, Number, Rational
+import fractions
+from typing import Callable, Dict, Sequence, Tuple
+import weakref
 
-from wilf.utils import product
+from wilf.utils import postorder, product
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Stored in SymbolicExpression._normal to mark a node as its own simplification
+_IS_NORMAL = object()
 
 class SymbolicExpression(ABC):
+    """Base class for symbolic expression nodes.
+
+    Nodes are immutable and hash-consed: constructing a node with the same
+    class and arguments as a live node returns that node, so structurally equal
+    expressions are identical objects and equality is an identity check. Each
+    node caches its hash and, once computed, its simplified form.
+
+    Simplification normalises each node once, bottom up: a node's children
+    are simplified (usually a cached lookup), then the rules for its own class
+    combine them. See _sum, _product, _power and _fraction for the rules.
+    """
+    __slots__ = ('_hash', '_normal', '__weakref__')
+
+    _interned = weakref.WeakValueDictionary()
+
+    # simplify() calls answered from the cache, and ones that normalised a node
+    simplify_hits = 0
+    simplify_misses = 0
+
+    @classmethod
+    def _intern(cls, args : tuple, init : Callable) -> 'SymbolicExpression':
+        """Return the unique node of this class with the given arguments.
+
+        init is called on newly created nodes to set their fields.
+        """
+        key = (cls, tuple(_intern_key(a) for a in args))
+        try:
+            node = SymbolicExpression._interned.get(key)
+        except TypeError:
+            unhashable = next((type(a).__name__ for a in args if getattr(a, '__hash__', None) is None), 'argument')
+            raise TypeError(f"Can't build a {cls.__name__} from an unhashable {unhashable}. "
+                            "To evaluate an expression at numpy arrays, use lambdify.") from None
+        if node is None:
+            node = object.__new__(cls)
+            init(node)
+            object.__setattr__(node, '_hash', hash(key))
+            object.__setattr__(node, '_normal', None)
+            SymbolicExpression._interned[key] = node
+        return node
+
+    @property
+    @abstractmethod
+    def args(self) -> tuple:
+        """The arguments this node was constructed from"""
+        ...
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __hash__(self):
+        return self._hash
+
+    def __reduce__(self):
+        return (self.__class__, self.args)
+
+    # Arithmetic combines the simplified operands directly, without building
+    # (and simplifying) an intermediate node.
+
     def __mul__(self, other : 'Expression') -> 'Expression':
         if not isinstance(other, Expression):
             return NotImplemented
-        return Product(self, other).simplify()
+        return _product([self.simplify(), simplify_expr(other)])
 
     def __rmul__(self, other : 'Expression') -> 'Expression':
         if not isinstance(other, Expression):
             return NotImplemented
-        return Product(other, self).simplify()
+        return _product([simplify_expr(other), self.simplify()])
 
     def __add__(self, other : 'Expression') -> 'Expression':
         if not isinstance(other, Expression):
             return NotImplemented
-        return Sum(self, other).simplify()
+        return _sum([self.simplify(), simplify_expr(other)])
 
     def __radd__(self, other : 'Expression') -> 'Expression':
         if not isinstance(other, Expression):
             return NotImplemented
-        return Sum(other, self).simplify()
+        return _sum([simplify_expr(other), self.simplify()])
     
     def __sub__(self, other : 'Expression') -> 'Expression':
         if not isinstance(other, Expression):
             return NotImplemented
-        return Sum(self, -other).simplify()
+        return _sum([self.simplify(), simplify_expr(-other)])
 
     def __rsub__(self, other : 'Expression') -> 'Expression':
         if not isinstance(other, Expression):
             return NotImplemented
-        return Sum(other, -self).simplify()
+        return _sum([simplify_expr(other), -self])
     
     def __pow__(self, other : 'Expression') -> 'Expression':
         if not isinstance(other, Expression):
             return NotImplemented
-        return Power(self, other).simplify()
+        return _power(self.simplify(), simplify_expr(other))
 
     def __neg__(self) -> 'Expression':
-        return Product(-1, self).simplify()
+        return _product([-1, self.simplify()])
 
     def __truediv__(self, other : 'Expression') -> 'Expression':
         if not isinstance(other, Expression):
             return NotImplemented
-        return Fraction(self, other).simplify()
+        return _fraction(self.simplify(), simplify_expr(other))
 
     def __rtruediv__(self, other : 'Expression') -> 'Expression':
         if not isinstance(other, Expression):
             return NotImplemented
-        return Fraction(other, self).simplify()
+        return _fraction(simplify_expr(other), self.simplify())
+
+    def simplify(self) -> 'Expression':
+        """Return the simplified form of this expression, computing it only once"""
+        normal = self._normal
+        if normal is _IS_NORMAL:
+            SymbolicExpression.simplify_hits += 1
+            return self
+        if normal is None:
+            SymbolicExpression.simplify_misses += 1
+            normal = self._simplify()
+            if normal is self:
+                object.__setattr__(self, '_normal', _IS_NORMAL)
+            else:
+                object.__setattr__(self, '_normal', normal)
+                if isinstance(normal, SymbolicExpression) and normal._normal is None:
+                    object.__setattr__(normal, '_normal', _IS_NORMAL)
+        else:
+            SymbolicExpression.simplify_hits += 1
+        return normal
 
     @abstractmethod
-    def simplify(self):
+    def _simplify(self) -> 'Expression':
         ...
 
     def subs(self, subs: 'Dict[Symbol, Expression]', simplify: bool = True) -> 'Expression':
-        new_dict = {}
-        for k, v in self.__dict__.items():
-            if isinstance(v, tuple):
-                new_dict[k] = (subs_expr(v, subs, simplify=simplify) for v in v)
-            else:
-                new_dict[k] = subs_expr(v, subs, simplify=simplify)
-        new_expr = self.__class__(**new_dict)
+        new_expr = self.__class__(*(subs_expr(a, subs, simplify=simplify) for a in self.args))
         if simplify:
             return simplify_expr(new_expr)
         else:
@@ -73,6 +154,22 @@ class SymbolicExpression(ABC):
     
 Expression = SymbolicExpression | Number
 
+def _intern_key(arg):
+    """Numbers are keyed by type too, so that e.g. Sum(1) and Sum(1.0) stay distinct"""
+    if isinstance(arg, SymbolicExpression):
+        return arg
+    return (type(arg), arg)
+
+def _flatten(cls : type, terms) -> tuple:
+    """Splice the terms of any nested cls nodes into a flat tuple"""
+    flat = []
+    for t in terms:
+        if isinstance(t, cls):
+            flat.extend(t.terms)
+        else:
+            flat.append(t)
+    return tuple(flat)
+
 def subs_expr(expr:'Expression', subs: 'Dict[Symbol, Expression]', simplify: bool = True) -> 'Expression':
     if expr in subs:
         return subs[expr]
@@ -84,20 +181,25 @@ def subs_expr(expr:'Expression', subs: 'Dict[Symbol, Expression]', simplify: boo
             return expr
 
 def simplify_expr(expr: 'Expression') -> 'Expression':
-    match expr:
-        case SymbolicExpression():
-            return expr.simplify()
-        case Number():
-            return expr
+    if isinstance(expr, SymbolicExpression):
+        return expr.simplify()
+    return expr
 
-@dataclass(frozen=True)
 class Symbol(SymbolicExpression):
-    name: str
+    __slots__ = ('name',)
+    __match_args__ = ('name',)
+
+    def __new__(cls, name : str):
+        return cls._intern((name,), lambda node: object.__setattr__(node, 'name', name))
+
+    @property
+    def args(self) -> tuple:
+        return (self.name,)
 
     def __repr__(self):
         return self.name
 
-    def simplify(self):
+    def _simplify(self):
         return self
 
     def subs(self, subs: 'Dict[Symbol, Expression]', simplify : bool = True) -> 'Expression':
@@ -107,138 +209,501 @@ class Symbol(SymbolicExpression):
         else:
             return out
 
-@dataclass(init=False)
 class Sum(SymbolicExpression):
-    terms : Tuple[Expression]
+    # _like caches the terms of a normal sum by like-term key; see _append
+    __slots__ = ('terms', '_like')
+    __match_args__ = ('terms',)
 
-    def __init__(self, *args : Tuple[Expression], terms : Tuple[Expression] = None):
+    def __new__(cls, *args : Tuple[Expression], terms : Tuple[Expression] = None):
         if args and terms:
             raise ValueError("Cannot pass both args and terms")
         if terms:
             args = terms
-        self.terms = tuple()
-        for t in args:
-            if isinstance(t, Sum):
-                self.terms += t.terms
-            else:
-                self.terms += (t,)
+        return cls._new(_flatten(Sum, args))
 
-    def __hash__(self):
-        return hash(self.terms)
+    @classmethod
+    def _new(cls, flat : tuple) -> 'Sum':
+        def init(node):
+            object.__setattr__(node, 'terms', flat)
+            object.__setattr__(node, '_like', None)
+        return cls._intern(flat, init)
 
-    def __str__(self):
-        return " + ".join(map(str, self.terms))
+    @property
+    def args(self) -> tuple:
+        return self.terms
 
-    def simplify(self):
-        terms_s = [simplify_expr(t) for t in self.terms]
+    def __repr__(self):
+        return f'Sum(terms={self.terms!r})'
 
-        numeric_term = sum([t for t in terms_s if isinstance(t, Number)])
-        non_numeric_terms = [t for t in terms_s if not isinstance(t, Number)]
+    def __str__(self):
+        return " + ".join(map(str, self.terms))
 
-        if numeric_term == 0:
-            if len(non_numeric_terms) == 0:
-                return 0
-            if len(non_numeric_terms) == 1:
-                return non_numeric_terms[0]
-            else:
-                return Sum(*non_numeric_terms)
-        else:
-            if len(non_numeric_terms) == 0:
-                return numeric_term
-            else:
-                return Sum(numeric_term, *non_numeric_terms)
+    def _simplify(self):
+        return _sum([simplify_expr(t) for t in self.terms])
 
-@dataclass(init=False)
 class Product(SymbolicExpression):
-    terms : Tuple[Expression]
+    __slots__ = ('terms',)
+    __match_args__ = ('terms',)
 
-    def __init__(self, *args : Tuple[Expression], terms : Tuple[Expression] = None):
+    def __new__(cls, *args : Tuple[Expression], terms : Tuple[Expression] = None):
         if args and terms:
             raise ValueError("Cannot specify both args and terms")
         if terms:
             args = terms
-        self.terms = tuple()
-        for t in args:
-            if isinstance(t, Product):
-                self.terms += t.terms
-            else:
-                self.terms += (t,)
+        flat = _flatten(Product, args)
+        return cls._intern(flat, lambda node: object.__setattr__(node, 'terms', flat))
 
-    def __hash__(self):
-        return hash(self.terms)
+    @property
+    def args(self) -> tuple:
+        return self.terms
+
+    def __repr__(self):
+        return f'Product(terms={self.terms!r})'
 
     def __str__(self):
         return " * ".join(map(str, self.terms))
 
-    def simplify(self):
-        terms_s = [simplify_expr(t) for t in self.terms]
+    def _simplify(self):
+        return _product([simplify_expr(t) for t in self.terms])
 
-        numeric_term = product([t for t in terms_s if isinstance(t, Number)])
-        non_numeric_terms = [t for t in terms_s if not isinstance(t, Number)]
+class Power(SymbolicExpression):
+    __slots__ = ('base', 'exponent')
+    __match_args__ = ('base', 'exponent')
 
-        if numeric_term == 0:
-            return 0
-        elif numeric_term == 1:
-            if len(non_numeric_terms) == 0:
-                return 1
-            if len(non_numeric_terms) == 1:
-                return non_numeric_terms[0]
-            else:
-                return Product(*non_numeric_terms)
-        else:
-            if len(non_numeric_terms) == 0:
-                return numeric_term
-            else:
-                return Product(numeric_term, *non_numeric_terms)
+    def __new__(cls, base : Expression, exponent : Expression):
+        def init(node):
+            object.__setattr__(node, 'base', base)
+            object.__setattr__(node, 'exponent', exponent)
+        return cls._intern((base, exponent), init)
 
-@dataclass(frozen=True)
-class Power(SymbolicExpression):
-    base : Expression
-    exponent : Expression
+    @property
+    def args(self) -> tuple:
+        return (self.base, self.exponent)
 
     def __repr__(self):
         return f'{self.base}^{self.exponent}'
 
-    def simplify(self):
-        base_s = simplify_expr(self.base)
-        exponent_s = simplify_expr(self.exponent)
-        if isinstance(base_s, Number) and isinstance(exponent_s, Number):
-            return base_s ** exponent_s
-        elif isinstance(base_s, Number):
-            if base_s == 0:
-                return 0
-            if base_s == 1:
-                return 1
-            else:
-                return Power(base_s, exponent_s)
-        elif isinstance(exponent_s, Number):
-            if exponent_s == 0:
-                return 1
-            elif exponent_s == 1:
-                return base_s
-            else:
-                return Power(base_s, exponent_s)
-        else:
-            return Power(base_s, exponent_s)
+    def _simplify(self):
+        return _power(simplify_expr(self.base), simplify_expr(self.exponent))
 
-@dataclass(frozen=True)
 class Fraction(SymbolicExpression):
-    numerator : Expression
-    denominator : Expression
+    __slots__ = ('numerator', 'denominator')
+    __match_args__ = ('numerator', 'denominator')
+
+    def __new__(cls, numerator : Expression, denominator : Expression):
+        def init(node):
+            object.__setattr__(node, 'numerator', numerator)
+            object.__setattr__(node, 'denominator', denominator)
+        return cls._intern((numerator, denominator), init)
+
+    @property
+    def args(self) -> tuple:
+        return (self.numerator, self.denominator)
 
     def __repr__(self):
         return f'{self.numerator}/{self.denominator}'
 
-    def simplify(self):
-        numerator_s = simplify_expr(self.numerator)
-        denominator_s = simplify_expr(self.denominator)
-        if isinstance(denominator_s, Number) and denominator_s == 0:
-            return float('inf')
-        elif isinstance(numerator_s, Number) and isinstance(denominator_s, Number):
-            return numerator_s / denominator_s
-        elif isinstance(numerator_s, Number) and numerator_s == 0:
-            return 0
-        elif isinstance(denominator_s, Number) and denominator_s == 1:
-            return numerator_s
+    def _simplify(self):
+        return _fraction(simplify_expr(self.numerator), simplify_expr(self.denominator))
+
+# Normal forms. Each of these takes arguments that are already simplified and
+# returns the simplified node combining them, so that simplifying an
+# expression does a bounded amount of work per node: the rules only look at
+# one level of the tree.
+
+def _normal(node : SymbolicExpression) -> SymbolicExpression:
+    """Mark a node built from normal arguments as its own simplification"""
+    if node._normal is None:
+        object.__setattr__(node, '_normal', _IS_NORMAL)
+    return node
+
+def _sum(terms : list) -> 'Expression':
+    """The normal form of a sum of simplified terms.
+
+    Nested sums are flattened. Numbers are added up, and the total comes
+    first unless it is zero. Like terms, which differ only by a numeric
+    coefficient (e.g. 2*x*y and y*x/3), are collected into one, where the
+    first of them was; if the coefficients cancel the term is dropped.
+    """
+    if len(terms) == 2 and type(terms[0]) is Sum and type(terms[1]) is not Sum:
+        # The common case of building a sum term by term
+        out = _append(terms[0], terms[1])
+        if out is not None:
+            return out
+    constant = 0
+    like = {}   # key of the non-numeric part -> [part, coefficient, original term or None]
+    for t in _flatten(Sum, terms):
+        if not isinstance(t, SymbolicExpression):
+            constant += t
+            continue
+        c, m = _coefficient(t)
+        key = _factor_key(m)
+        entry = like.get(key)
+        if entry is None:
+            like[key] = [m, c, t]
+        else:
+            entry[1] += c
+            entry[2] = None
+    constant = _whole(constant)
+    out = [] if constant == 0 else [constant]
+    for m, c, t in like.values():
+        if t is not None:
+            out.append(t)
+        elif c != 0:
+            out.append(m if c == 1 else _product([c, m]))
+    if any(isinstance(t, Sum) for t in out):
+        # A collected term that is itself a sum, e.g. 2*(x+1) - (x+1)
+        return _sum(out)
+    if not out:
+        return constant
+    if len(out) == 1:
+        return out[0]
+    return _normal(Sum(*out))
+
+def _append(s : Sum, t : 'Expression') -> 'Expression | None':
+    """_sum([s, t]) for a normal sum s and a term t that isn't a sum.
+
+    Only t is split into a coefficient and the rest: s keeps its terms by
+    like-term key, so adding one term doesn't look at the others again.
+    Returns None if the result is not a sum of s's terms and one more.
+    """
+    terms = s.terms
+    if s._normal is not _IS_NORMAL:
+        return None
+    if not isinstance(t, SymbolicExpression):
+        rest = terms if isinstance(terms[0], SymbolicExpression) else terms[1:]
+        constant = _whole(t if rest is terms else terms[0] + t)
+        out = rest if constant == 0 else (constant,) + rest
+        like = s._like
+    else:
+        like = _like_terms(s)
+        c, m = _coefficient(t)
+        key = _factor_key(m)
+        old = like.get(key)
+        like = dict(like)
+        if old is None:
+            out = terms + (t,)
+            like[key] = t
+        else:
+            # The collected term takes the place, and the factor order, of the old one
+            c_old, m = _coefficient(old)
+            c = c_old + c
+            i = terms.index(old)
+            if c == 0:
+                out = terms[:i] + terms[i + 1:]
+                del like[key]
+            else:
+                new = m if c == 1 else _product([c, m])
+                if type(new) is Sum:
+                    return None
+                out = terms[:i] + (new,) + terms[i + 1:]
+                like[key] = new
+    if len(out) == 1:
+        return out[0]
+    node = _normal(Sum._new(out))
+    if node._like is None:
+        object.__setattr__(node, '_like', like)
+    return node
+
+def _like_terms(s : Sum) -> dict:
+    """The terms of a normal sum by like-term key, built once per sum"""
+    if s._like is None:
+        like = {}
+        for t in s.terms:
+            if isinstance(t, SymbolicExpression):
+                like[_factor_key(_coefficient(t)[1])] = t
+        object.__setattr__(s, '_like', like)
+    return s._like
+
+def _coefficient(term : 'SymbolicExpression') -> tuple:
+    """Split a simplified term into a numeric coefficient and the rest"""
+    # Sums are built term by term, so this is kept cheap
+    cls = type(term)
+    if cls is Product and not isinstance(term.terms[0], SymbolicExpression):
+        rest = term.terms[1:]
+        return term.terms[0], rest[0] if len(rest) == 1 else _normal(Product(*rest))
+    if cls is Fraction and not isinstance(term.denominator, SymbolicExpression):
+        c, m = _coefficient(term.numerator)
+        if isinstance(c, Integral) and isinstance(term.denominator, Integral):
+            return fractions.Fraction(int(c), int(term.denominator)), m
+        return c / term.denominator, m
+    return 1, term
+
+def _whole(c : Number) -> Number:
+    """A whole-number Fraction as an int, so that e.g. 2 and Fraction(4, 2) simplify alike"""
+    if isinstance(c, fractions.Fraction) and c.denominator == 1:
+        return c.numerator
+    return c
+
+def _factor_key(m : 'SymbolicExpression'):
+    """Products of the same factors in any order are like terms"""
+    return frozenset(m.terms) if type(m) is Product else m
+
+def _product(terms : list) -> 'Expression':
+    """The normal form of a product of simplified terms.
+
+    Nested products are flattened, and fractions are pulled out so that the
+    result is a single fraction of products. Numbers are multiplied, and the
+    result comes first unless it is one (or everything, if it is zero).
+    Factors with the same base are combined by adding their exponents, e.g.
+    x * x**2 * y * x**-3 is y.
+    """
+    coefficient = 1
+    denominators = []
+    powers = {}   # base -> [base, exponent]
+    pending = list(reversed(terms))
+    while pending:
+        t = pending.pop()
+        cls = type(t)
+        if cls is Product:
+            pending.extend(reversed(t.terms))
+            continue
+        if cls is Fraction:
+            pending.append(t.numerator)
+            denominators.append(t.denominator)
+            continue
+        if cls is Power:
+            base, exponent = t.base, t.exponent
+        elif isinstance(t, SymbolicExpression):
+            base, exponent = t, 1
+        else:
+            coefficient *= t
+            continue
+        entry = powers.get(base)
+        if entry is None:
+            powers[base] = [base, exponent]
+        elif isinstance(entry[1], Number) and isinstance(exponent, Number):
+            entry[1] += exponent
+        else:
+            entry[1] = _sum([entry[1], exponent])
+    if coefficient == 0:
+        return 0
+    if denominators:
+        numerator = _product([coefficient] + [_power(base, exponent) for base, exponent in powers.values()])
+        return _fraction(numerator, _product(denominators))
+    factors = []
+    for base, exponent in powers.values():
+        f = _power(base, exponent)
+        if isinstance(f, Number):
+            coefficient *= f
         else:
-            return Fraction(numerator_s, denominator_s)
\ No newline at end of file
+            factors.append(f)
+    if coefficient == 0:
+        return 0
+    coefficient = _whole(coefficient)
+    if not factors:
+        return coefficient
+    if isinstance(coefficient, fractions.Fraction):
+        # A rational coefficient is an integer one over an integer, as _fraction gives it
+        return _fraction(_product([coefficient.numerator] + factors), coefficient.denominator)
+    if coefficient == 1:
+        return factors[0] if len(factors) == 1 else _normal(Product(*factors))
+    return _normal(Product(coefficient, *factors))
+
+def _power(base : 'Expression', exponent : 'Expression') -> 'Expression':
+    """The normal form of a simplified base to a simplified exponent.
+
+    Numbers are evaluated, and powers of 0 and 1, and to 0 and 1, are
+    trivial. Integer powers distribute over products and fractions, and
+    multiply the exponent of a power: (x**y)**2 is x**(2*y). Negative integer
+    powers of products and fractions become fractions.
+    """
+    if isinstance(base, Number) and isinstance(exponent, Number):
+        return base ** exponent
+    if isinstance(base, Number) and (base == 0 or base == 1):
+        return base
+    if isinstance(exponent, Number):
+        if exponent == 0:
+            return 1
+        if exponent == 1:
+            return base
+    if isinstance(exponent, Integral):
+        match base:
+            case Power(b, e):
+                return _power(b, e * exponent if isinstance(e, Number) else _product([exponent, e]))
+            case Product() | Fraction() if exponent < 0:
+                return _fraction(1, _power(base, -exponent))
+            case Product(factors):
+                return _product([_power(f, exponent) for f in factors])
+            case Fraction(numerator, denominator):
+                return _fraction(_power(numerator, exponent), _power(denominator, exponent))
+    return _normal(Power(base, exponent))
+
+def _fraction(numerator : 'Expression', denominator : 'Expression') -> 'Expression':
+    """The normal form of a simplified numerator over a simplified denominator.
+
+    Division by zero gives inf, and numbers are divided. Nested fractions are
+    flattened into one. Factors common to both sides are cancelled, e.g.
+    x**3*y / (x*z) is x**2*y / z. Integer and rational coefficients are reduced
+    to integers in lowest terms with a positive denominator; other numeric
+    coefficients are divided into the numerator.
+    """
+    if isinstance(denominator, Number) and denominator == 0:
+        return float('inf')
+    if isinstance(numerator, Number) and isinstance(denominator, Number):
+        return numerator / denominator
+    if isinstance(numerator, Number) and numerator == 0:
+        return 0
+    if isinstance(denominator, Number) and denominator == 1:
+        return numerator
+    if isinstance(numerator, Fraction) or isinstance(denominator, Fraction):
+        n, d = (numerator.numerator, numerator.denominator) if isinstance(numerator, Fraction) else (numerator, 1)
+        dn, dd = (denominator.numerator, denominator.denominator) if isinstance(denominator, Fraction) else (denominator, 1)
+        return _fraction(_product([n, dd]), _product([d, dn]))
+
+    cn, top = _factors(numerator)
+    cd, bottom = _factors(denominator)
+    for base in list(top):
+        if base in bottom and isinstance(top[base], Number) and isinstance(bottom[base], Number):
+            net = top[base] - bottom[base]
+            top[base] = net if net > 0 else 0
+            bottom[base] = -net if net < 0 else 0
+    if isinstance(cn, Integral) and isinstance(cd, Integral):
+        g = gcd(int(cn), int(cd))
+        cn, cd = cn // g, cd // g
+        if cd < 0:
+            cn, cd = -cn, -cd
+    elif isinstance(cn, Rational) and isinstance(cd, Rational):
+        q = fractions.Fraction(cn) / fractions.Fraction(cd)
+        cn, cd = q.numerator, q.denominator
+    else:
+        cn, cd = cn / cd, 1
+    numerator = _product([cn] + [_power(b, e) for b, e in top.items()])
+    denominator = _product([cd] + [_power(b, e) for b, e in bottom.items()])
+    if isinstance(denominator, Number) and denominator == 1:
+        return numerator
+    return _normal(Fraction(numerator, denominator))
+
+def _factors(expr : 'Expression') -> tuple:
+    """Split a simplified product into a numeric coefficient and {base: exponent}"""
+    if isinstance(expr, Number):
+        return expr, {}
+    coefficient = 1
+    factors = {}
+    for t in expr.terms if isinstance(expr, Product) else (expr,):
+        match t:
+            case Number():
+                coefficient = t
+            case Power(base, exponent) if isinstance(exponent, Number):
+                factors[base] = exponent
+            case _:
+                factors[t] = 1
+    return coefficient, factors
+
+def lambdify(symbols : 'Symbol | Sequence[Symbol]', expr : 'Expression') -> Callable:
+    """Compile an expression into a function of the given symbols.
+
+    The expression is turned into straight-line Python source, one statement
+    per distinct subexpression (see codegen), which is compiled once and
+    cached for as long as the expression is alive. The returned function only
+    applies the arithmetic, so it can be called with numpy arrays to evaluate
+    the expression at many points in one vectorised pass:
+
+        >>> f = lambdify(t, t**2 + 1)
+        >>> f(np.linspace(0, 1, 1000000))
+
+    Any symbol in the expression that is not in symbols raises a ValueError.
+    """
+    if isinstance(symbols, Symbol):
+        symbols = (symbols,)
+    symbols = tuple(symbols)
+    compiled = _compiled(symbols, expr)
+    n = len(symbols)
+
+    def f(*args):
+        if len(args) != n:
+            raise TypeError(f"Expected {n} arguments, got {len(args)}")
+        if np is None or not any(isinstance(a, (list, tuple, np.ndarray)) for a in args):
+            return compiled(*args)
+        args = tuple(np.asarray(a) if isinstance(a, (list, tuple)) else a for a in args)
+        out = compiled(*args)
+        # Constant expressions should still come out with the shape of the input
+        if isinstance(out, Number):
+            out = np.full(np.broadcast(*args).shape, out)
+        return out
+    return f
+
+
+def codegen(symbols : 'Symbol | Sequence[Symbol]', expr : 'Expression') -> str:
+    """The Python source of a function of symbols which evaluates expr.
+
+    Equal subexpressions are the same node (see SymbolicExpression), so each
+    distinct node is computed once, into a local, and reused wherever it
+    appears. Arguments are named by position, _a0, _a1, ..., and constants
+    other than small ints are read from globals _c0, _c1, ... (see
+    _compiled for their values).
+    """
+    if isinstance(symbols, Symbol):
+        symbols = (symbols,)
+    return _source(tuple(symbols), expr)[0]
+
+
+# Compiled functions for each live expression, by the tuple of symbols
+_functions = weakref.WeakKeyDictionary()
+
+# Sums and products with more terms than this are evaluated with sum() and
+# product(), rather than as a chain of binary operators.
+_CHAIN_LIMIT = 32
+
+def _compiled(symbols : tuple, expr : 'Expression') -> Callable:
+    """The compiled function of symbols evaluating expr, from the cache if possible"""
+    if not isinstance(expr, SymbolicExpression):
+        source, namespace = _source(symbols, expr)
+        exec(source, namespace)
+        return namespace['f']
+    functions = _functions.get(expr)
+    if functions is None:
+        functions = _functions[expr] = {}
+    f = functions.get(symbols)
+    if f is None:
+        source, namespace = _source(symbols, expr)
+        exec(compile(source, '<wilf.symbolics.codegen>', 'exec'), namespace)
+        f = functions[symbols] = namespace['f']
+    return f
+
+def _source(symbols : tuple, expr : 'Expression') -> tuple:
+    """The source of a function evaluating expr, and the globals it needs"""
+    names = {s: f'_a{i}' for i, s in enumerate(symbols)}
+    namespace = {'product': product}
+    constants = {}
+
+    def ref(a):
+        if isinstance(a, SymbolicExpression):
+            return names[a]
+        if type(a) is int:
+            return repr(a) if a >= 0 else f'({a})'
+        key = (type(a), a)
+        if key not in constants:
+            constants[key] = f'_c{len(constants)}'
+            namespace[constants[key]] = a
+        return constants[key]
+
+    def chain(op : str, function : str, terms : tuple) -> str:
+        if len(terms) <= _CHAIN_LIMIT:
+            return f' {op} '.join(map(ref, terms))
+        return f'{function}(({", ".join(map(ref, terms))},))'
+
+    lines = [f'def f({", ".join(names.values())}):']
+    children = lambda e: [a for a in e.args if isinstance(a, SymbolicExpression)] if isinstance(e, SymbolicExpression) else []
+    for node in postorder(expr, children):
+        match node:
+            case Symbol():
+                if node not in names:
+                    raise ValueError(f"Symbol {node} is not an argument")
+                continue
+            case Sum(terms):
+                value = chain('+', 'sum', terms)
+            case Product(terms):
+                value = chain('*', 'product', terms)
+            case Power(base, exponent):
+                value = f'{ref(base)} ** {ref(exponent)}'
+            case Fraction(numerator, denominator):
+                value = f'{ref(numerator)} / {ref(denominator)}'
+            case Number():
+                continue
+            case _:
+                raise TypeError(f"Can't compile {node!r}")
+        names[node] = f'_t{len(lines) - 1}'
+        lines.append(f'    {names[node]} = {value}')
+    lines.append(f'    return {ref(expr)}')
+    return '\n'.join(lines) + '\n', namespace
@@ -1,7 +1,29 @@
 from functools import reduce
+from typing import Callable
 
 def product(it):
     return reduce(lambda x, y: x * y, it, 1)
 
 def factorial(n):
-    return product(range(1, n + 1))
\ No newline at end of file
+    return product(range(1, n + 1))
+
+def postorder(root, children : Callable) -> list:
+    """The nodes reachable from root through children(node), each listed after its children.
+
+    Nodes are told apart by identity. The graph is walked with an explicit
+    stack rather than by recursion, so its depth isn't limited.
+    """
+    order = []
+    seen = set()
+    stack = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if expanded:
+            order.append(node)
+            continue
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        stack.append((node, True))
+        stack.extend((child, False) for child in children(node) if id(child) not in seen)
+    return order